@@ -1,9 +1,7 @@
-import collections
 import contextlib
 import dataclasses
 import enum
 import functools
-import hashlib
 import logging
 import os
 import stat
@@ -11,10 +9,10 @@ import threading
 import time
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Optional, Tuple, Callable, Any, Dict, Generator, Union, Set, Deque, Literal, BinaryIO, ContextManager, overload, TypeVar
+from typing import List, Optional, Tuple, Callable, Any, Dict, Generator, Set, Literal, BinaryIO, ContextManager, TypeVar, FrozenSet
 
 import pathspec
-from typing_extensions import NoReturn, override, Self
+from typing_extensions import NoReturn, override, Self, Protocol
 
 from prime_backup.action.create_backup_action_base import CreateBackupActionBase
 from prime_backup.compressors import Compressor, CompressMethod
@@ -27,7 +25,7 @@ from prime_backup.types.backup_info import BackupInfo
 from prime_backup.types.backup_tags import BackupTags
 from prime_backup.types.operator import Operator
 from prime_backup.types.units import ByteCount
-from prime_backup.utils import hash_utils, misc_utils, blob_utils, file_utils, sqlalchemy_utils
+from prime_backup.utils import hash_utils, misc_utils, blob_utils, file_utils, sqlalchemy_utils, collection_utils
 from prime_backup.utils.path_like import PathLike
 from prime_backup.utils.thread_pool import FailFastBlockingThreadPool
 from prime_backup.utils.time_cost_stats import TimeCostStats
@@ -68,13 +66,18 @@ class _BlobCreatePolicy(enum.Enum):
 	"""
 	read_all = enum.auto()   # small files: read all in memory, calc hash                                |  read 1x, write 1x
 	hash_once = enum.auto()  # files with unique size: compress+hash to temp file, then move             |  read 1x, write 1x, move 1x
-	copy_hash = enum.auto()  # files that keep changing: copy to temp file, calc hash, compress to blob  |  read 2x, write 2x. need more spaces
+	copy_hash = enum.auto()  # files that keep changing: copy+hash to temp file, compress to blob         |  read 2x, write 2x. need more spaces
 	default = enum.auto()    # default policy: compress+hash to blob store, check hash again             |  read 2x, write 1x
 
 
 _BLOB_FILE_CHANGED_RETRY_COUNT = 3
 _READ_ALL_SIZE_THRESHOLD = 8 * 1024  # 8KiB
 _HASH_ONCE_SIZE_THRESHOLD = 10 * 1024 * 1024  # 10MiB
+_DROP_FILE_CACHE_SIZE_THRESHOLD = 16 * 1024 * 1024  # 16MiB
+_BATCH_FETCH_MAX_DELAY_NS = 100 * 1000 * 1000  # 100ms
+_HASH_TASK_MAX_FILE_COUNT = 64
+_HASH_TASK_MAX_BYTES = 1024 * 1024  # 1MiB
+_CREATE_FILE_WINDOW_SIZE = 1024
 
 
 class _TimeCostKey(enum.Enum):
@@ -86,6 +89,7 @@ class _TimeCostKey(enum.Enum):
 
 	stage_scan_files = enum.auto()
 	stage_reuse_unchanged_files = enum.auto()
+	stage_fetch_blob_sizes = enum.auto()
 	stage_pre_calculate_hash = enum.auto()
 	stage_prepare_blob_store = enum.auto()
 	stage_create_files = enum.auto()
@@ -96,6 +100,9 @@ class _TimeCostKey(enum.Enum):
 		return self.name < other.name
 
 
+_TIME_COST_KIND_KEYS: FrozenSet[_TimeCostKey] = frozenset(k for k in _TimeCostKey if k.name.startswith('kind_'))
+
+
 class BatchFetcherBase(ABC):
 	Callback = Callable
 	tasks: dict
@@ -103,17 +110,19 @@ class BatchFetcherBase(ABC):
 	def __init__(self, session: DbSession, max_batch_size: int, time_costs: TimeCostStats[_TimeCostKey]):
 		self.session = session
 		self.max_batch_size = max_batch_size
-		self.first_task_scheduled_time = time.time()
+		self.first_task_scheduled_time_ns = time.monotonic_ns()
 		self.time_costs = time_costs
 
-	def _post_query(self):
-		now = time.time()
-		if len(self.tasks) == 1:
-			self.first_task_scheduled_time = now
-		self.flush_if_needed()
+	def _add_task(self, key: Any, callback: Callback):
+		# the clock is only read for the first task of a batch. The deadline check is done in flush_if_needed()
+		if len(self.tasks) == 0:
+			self.first_task_scheduled_time_ns = time.monotonic_ns()
+		self.tasks.setdefault(key, []).append(callback)
+		if len(self.tasks) >= self.max_batch_size:
+			self._batch_run()
 
 	def flush_if_needed(self):
-		if len(self.tasks) > 0 and (len(self.tasks) >= self.max_batch_size or time.time() - self.first_task_scheduled_time >= 0.1):
+		if len(self.tasks) > 0 and (len(self.tasks) >= self.max_batch_size or time.monotonic_ns() - self.first_task_scheduled_time_ns >= _BATCH_FETCH_MAX_DELAY_NS):
 			self._batch_run()
 
 	def flush(self):
@@ -125,41 +134,6 @@ class BatchFetcherBase(ABC):
 		...
 
 
-class BlobBySizeFetcher(BatchFetcherBase):
-	@dataclasses.dataclass(frozen=True)
-	class Req:
-		size: int
-
-	@dataclasses.dataclass(frozen=True)
-	class Rsp:
-		exists: bool
-
-	Callback = Callable[[Rsp], None]
-	tasks: Dict[int, List[Callback]]
-
-	def __init__(self, session: DbSession, max_batch_size: int, result_cache: Dict[int, bool], time_costs: TimeCostStats[_TimeCostKey]):
-		super().__init__(session, max_batch_size, time_costs)
-		self.tasks: List[Tuple[int, BlobBySizeFetcher.Callback]] = []
-		self.sizes: Set[int] = set()
-		self.result_cache = result_cache
-
-	def query(self, query: Req, callback: Callback):
-		self.tasks.append((query.size, callback))
-		self.sizes.add(query.size)
-		self._post_query()
-
-	@override
-	def _batch_run(self):
-		with self.time_costs.measure_time_cost(_TimeCostKey.kind_db):
-			existence = self.session.has_blob_with_size_batched(list(self.sizes))
-		self.result_cache.update(existence)
-		# reverse since we want to keep the file order, and collections.deque.appendleft is FILO
-		for sz, callback in reversed(self.tasks):
-			callback(self.Rsp(existence[sz]))
-		self.tasks.clear()
-		self.sizes.clear()
-
-
 class BlobByHashFetcher(BatchFetcherBase):
 	@dataclasses.dataclass(frozen=True)
 	class Req:
@@ -174,71 +148,101 @@ class BlobByHashFetcher(BatchFetcherBase):
 
 	def __init__(self, session: DbSession, max_batch_size: int, result_cache: Dict[str, schema.Blob], time_costs: TimeCostStats[_TimeCostKey]):
 		super().__init__(session, max_batch_size, time_costs)
-		self.tasks: List[Tuple[str, BlobByHashFetcher.Callback]] = []
-		self.hashes: Set[str] = set()
+		self.tasks: Dict[str, List[BlobByHashFetcher.Callback]] = {}
 		self.result_cache = result_cache
 
 	def query(self, query: Req, callback: Callback):
-		self.tasks.append((query.hash, callback))
-		self.hashes.add(query.hash)
-		self._post_query()
+		self._add_task(query.hash, callback)
 
 	@override
 	def _batch_run(self):
 		with self.time_costs.measure_time_cost(_TimeCostKey.kind_db):
-			blobs = self.session.get_blobs(list(self.hashes))
+			blobs = self.session.get_blobs(list(self.tasks))
 		self.result_cache.update(blobs)
-		# reverse since we want to keep the file order, and collections.deque.appendleft is FILO
-		for h, callback in reversed(self.tasks):
-			callback(self.Rsp(blobs[h]))
+		# reverse since we want to keep the file order, and the ready stack of the scheduler is FILO
+		for h, callbacks in reversed(self.tasks.items()):
+			rsp = self.Rsp(blobs[h])
+			for callback in reversed(callbacks):
+				callback(rsp)
 		self.tasks.clear()
-		self.hashes.clear()
 
 
-BqmReq = Union[BlobBySizeFetcher.Req, BlobByHashFetcher.Req]
-BqmRsp = Union[BlobBySizeFetcher.Rsp, BlobByHashFetcher.Rsp]
+BqmReq = BlobByHashFetcher.Req
+BqmRsp = BlobByHashFetcher.Rsp
 
 
 class BatchQueryManager:
-	def __init__(self, session: DbSession, size_result_cache: dict, hash_result_cache: dict, time_costs: TimeCostStats[_TimeCostKey], *, max_batch_size: int = 100):
-		self.fetcher_size = BlobBySizeFetcher(session, max_batch_size, size_result_cache, time_costs)
+	"""
+	Blob existence by size is fetched in one go before the file creation, so only the by-hash queries are batched here
+	"""
+	def __init__(self, session: DbSession, hash_result_cache: dict, time_costs: TimeCostStats[_TimeCostKey], *, max_batch_size: int = 100):
 		self.fetcher_hash = BlobByHashFetcher(session, max_batch_size, hash_result_cache, time_costs)
 
-	@overload
-	def query(self, query: BlobBySizeFetcher.Req, callback: Callable[[BlobBySizeFetcher.Rsp], None]): ...
-	@overload
-	def query(self, query: BlobByHashFetcher.Req, callback: Callable[[BlobByHashFetcher.Rsp], None]): ...
-
-	def query(self,query: BqmReq, callback: Callable[[BqmRsp], None]):
-		if isinstance(query, BlobBySizeFetcher.Req):
-			self.fetcher_size.query(query, callback)
-		elif isinstance(query, BlobByHashFetcher.Req):
+	def query(self, query: BqmReq, callback: Callable[[BqmRsp], None]):
+		if isinstance(query, BlobByHashFetcher.Req):
 			self.fetcher_hash.query(query, callback)
 		else:
 			raise TypeError('unexpected query: {!r} {!r}'.format(type(query), query))
 
 	def flush_if_needed(self):
-		self.fetcher_size.flush_if_needed()
 		self.fetcher_hash.flush_if_needed()
 
 	def flush(self):
-		self.fetcher_size.flush()
 		self.fetcher_hash.flush()
 
 
+class _FileStat(Protocol):
+	"""
+	The subset of os.stat_result fields used in the backup creation
+	"""
+	@property
+	def st_mode(self) -> int: ...
+	@property
+	def st_size(self) -> int: ...
+	@property
+	def st_uid(self) -> int: ...
+	@property
+	def st_gid(self) -> int: ...
+	@property
+	def st_mtime_ns(self) -> int: ...
+	@property
+	def st_dev(self) -> int: ...
+	@property
+	def st_ino(self) -> int: ...
+
+
 @dataclasses.dataclass(frozen=True)
 class _ScanResultEntry:
+	"""
+	Only the used stat fields are stored, with no __dict__, to reduce the memory usage when there are tons of files
+	"""
+	__slots__ = ('path', 'st_mode', 'st_size', 'st_uid', 'st_gid', 'st_mtime_ns', 'st_dev', 'st_ino')
+
 	path: Path  # full path, including source_root
-	stat: os.stat_result
+	st_mode: int
+	st_size: int
+	st_uid: int
+	st_gid: int
+	st_mtime_ns: int
+	st_dev: int
+	st_ino: int
+
+	@classmethod
+	def of(cls, path: Path, st: os.stat_result) -> '_ScanResultEntry':
+		return cls(path, st.st_mode, st.st_size, st.st_uid, st.st_gid, st.st_mtime_ns, st.st_dev, st.st_ino)
 
 	def is_file(self) -> bool:
-		return stat.S_ISREG(self.stat.st_mode)
+		return stat.S_ISREG(self.st_mode)
 
 	def is_dir(self) -> bool:
-		return stat.S_ISDIR(self.stat.st_mode)
+		return stat.S_ISDIR(self.st_mode)
 
 	def is_symlink(self) -> bool:
-		return stat.S_ISLNK(self.stat.st_mode)
+		return stat.S_ISLNK(self.st_mode)
+
+
+_ContentStatKey = Tuple[str, Optional[int], Optional[int]]  # path, size, mtime_us
+_StatKey = Tuple[str, Optional[int], Optional[int], int, Optional[int], Optional[int]]  # path, size, mtime_us, mode, uid, gid
 
 
 @dataclasses.dataclass(frozen=True)
@@ -249,13 +253,18 @@ class _ScanResult:
 
 @dataclasses.dataclass(frozen=True)
 class _PreCalculationResult:
-	stats: Dict[Path, os.stat_result] = dataclasses.field(default_factory=dict)
-	hashes: Dict[Path, str] = dataclasses.field(default_factory=dict)
+	stats: Dict[Path, _FileStat] = dataclasses.field(default_factory=dict)
+	hashes: Dict[Path, str] = dataclasses.field(default_factory=dict)  # calculated from the file content in this run
+	reused_hashes: Dict[Path, str] = dataclasses.field(default_factory=dict)  # from the last backup, not verified against the file content
 	reused_files: Dict[Path, schema.File] = dataclasses.field(default_factory=dict)
 
 
 class CreateBackupAction(CreateBackupActionBase):
-	def __init__(self, creator: Operator, comment: str, *, tags: Optional[BackupTags] = None, source_path: Optional[Path] = None):
+	def __init__(self, creator: Operator, comment: str, *, tags: Optional[BackupTags] = None, source_path: Optional[Path] = None, skip_if_unchanged: bool = False):
+		"""
+		:param skip_if_unchanged: if the scanned files are stat-unchanged since the last backup, and it's a non-temporary non-hidden backup,
+		do not create a new backup, and return the last backup instead. Only works with config backup.reuse_stat_unchanged_file enabled
+		"""
 		super().__init__()
 		if tags is None:
 			tags = BackupTags()
@@ -263,19 +272,31 @@ class CreateBackupAction(CreateBackupActionBase):
 		self.creator = creator
 		self.comment = comment
 		self.tags = tags
+		self.skip_if_unchanged = skip_if_unchanged
+		self.__skipped_as_unchanged = False
 
 		self.__pre_calc_result = _PreCalculationResult()
-		self.__blob_store_st: Optional[os.stat_result] = None
-		self.__blob_store_in_cow_fs: Optional[bool] = None
+		self.__cow_copy_st_dev: Optional[int] = None  # st_dev of the blob store, if files can be COW copied into it
 
 		self.__batch_query_manager: Optional[BatchQueryManager] = None
 		self.__blob_by_size_cache: Dict[int, bool] = {}
 		self.__blob_by_hash_cache: Dict[str, schema.Blob] = {}
 
 		self.__source_path: Path = source_path or self.config.source_path
-		self.__time_costs: TimeCostStats[_TimeCostKey] = TimeCostStats()
+		# time costs are only for the debug logging, don't measure them if they will not be logged
+		self.__log_costs_enabled = self.config.debug and self.logger.isEnabledFor(logging.DEBUG)
+		self.__time_costs: TimeCostStats[_TimeCostKey] = TimeCostStats(_TimeCostKey, enabled=self.__log_costs_enabled)
+
+	@functools.cached_property
+	def __source_path_prefix(self) -> str:
+		return os.path.join(str(self.__source_path), '')  # with the trailing separator
 
 	def __file_path_to_db_path(self, path: Path) -> str:
+		# fast path: plain string slicing, which is much cheaper than the part-by-part comparing in PurePath.relative_to
+		path_str = str(path)
+		if path_str.startswith(prefix := self.__source_path_prefix):
+			rel_path_str = path_str[len(prefix):]
+			return rel_path_str if os.sep == '/' else rel_path_str.replace(os.sep, '/')
 		return path.relative_to(self.__source_path).as_posix()
 
 	def __scan_files(self) -> _ScanResult:
@@ -283,21 +304,23 @@ class CreateBackupAction(CreateBackupActionBase):
 			*self.config.backup.ignore_patterns,
 			*self.config.backup.retain_patterns,
 		])
+		has_deprecated_ignored_files = len(self.config.backup.ignored_files) > 0
 		result = _ScanResult()
 		visited_path: Set[Path] = set()  # full path
-		ignored_or_retained_paths: List[Path] = []   # related path
+		ignored_or_retained_paths: List[str] = []   # related posix path
 
-		def scan(full_path: Path, is_root_target: bool):
+		def scan(full_path: Path, is_root_target: bool, dir_entry: Optional[os.DirEntry] = None):
 			try:
-				rel_path = full_path.relative_to(self.__source_path)
+				# related posix path. pathspec accepts str directly, so no PurePath is needed here
+				rel_path = self.__file_path_to_db_path(full_path)
 			except ValueError:
 				self.logger.warning("Skipping backup path {!r} cuz it's not inside the source path {!r}".format(str(full_path), str(self.__source_path)))
 				return
 
-			if ignore_or_retained_patterns.match_file(rel_path) or self.config.backup.is_file_ignore_by_deprecated_ignored_files(rel_path.name):
+			if ignore_or_retained_patterns.match_file(rel_path) or (has_deprecated_ignored_files and self.config.backup.is_file_ignore_by_deprecated_ignored_files(full_path.name)):
 				ignored_or_retained_paths.append(rel_path)
 				if is_root_target:
-					self.logger.warning('Backup target {!r} is ignored or retained by config'.format(str(rel_path)))
+					self.logger.warning('Backup target {!r} is ignored or retained by config'.format(rel_path))
 				return
 
 			if full_path in visited_path:
@@ -305,28 +328,32 @@ class CreateBackupAction(CreateBackupActionBase):
 			visited_path.add(full_path)
 
 			try:
-				st = full_path.lstat()
+				# DirEntry caches the stat result, and on Windows it's even free since it comes with the directory listing
+				st = dir_entry.stat(follow_symlinks=False) if dir_entry is not None else full_path.lstat()
 			except FileNotFoundError:
 				if is_root_target:
-					self.logger.warning('Backup target {!r} does not exist, skipped. full_path: {!r}'.format(str(rel_path), str(full_path)))
+					self.logger.warning('Backup target {!r} does not exist, skipped. full_path: {!r}'.format(rel_path, str(full_path)))
 				return
 
-			entry = _ScanResultEntry(full_path, st)
+			entry = _ScanResultEntry.of(full_path, st)
 			result.all_files.append(entry)
 			if is_root_target:
-				result.root_targets.append(rel_path.as_posix())
+				result.root_targets.append(rel_path)
 
 			if entry.is_dir():
-				for child in os.listdir(full_path):
-					scan(full_path / child, False)
+				with os.scandir(full_path) as it:
+					children = list(it)  # don't keep the directory fd open during the recursion
+				for child in children:
+					scan(full_path / child.name, False, child)
 			elif is_root_target and entry.is_symlink() and self.config.backup.follow_target_symlink:
 				symlink_target = full_path.readlink()
 				symlink_target_full_path = self.__source_path / symlink_target
-				self.logger.info('Following root symlink target {!r} -> {!r} ({!r})'.format(str(rel_path), str(symlink_target), str(symlink_target_full_path)))
+				self.logger.info('Following root symlink target {!r} -> {!r} ({!r})'.format(rel_path, str(symlink_target), str(symlink_target_full_path)))
 				scan(symlink_target_full_path, True)
 
 		self.logger.debug(f'Scan file start, target patterns: {self.config.backup.targets}')
-		with self.__time_costs.measure_time_cost(_TimeCostKey.kind_fs) as scan_cost:
+		scan_start = time.time()
+		with self.__time_costs.measure_time_cost(_TimeCostKey.kind_fs):
 			target_patterns = pathspec.GitIgnoreSpec.from_lines(self.config.backup.targets)
 			target_paths: List[Path] = []
 			for candidate_target_name in sorted(os.listdir(self.__source_path)):
@@ -339,87 +366,113 @@ class CreateBackupAction(CreateBackupActionBase):
 				scan(target_path, True)
 
 		self.logger.debug('Scan file done, cost {:.2f}s, count {}, root_targets (len={}): {}, ignored_or_retained_paths[:100] (len={}): {}'.format(
-			scan_cost(), len(result.all_files),
+			time.time() - scan_start, len(result.all_files),
 			len(result.root_targets), result.root_targets,
-			len(ignored_or_retained_paths), [p.as_posix() for p in ignored_or_retained_paths][:100],
+			len(ignored_or_retained_paths), ignored_or_retained_paths[:100],
 		))
 		return result
 
+	def __is_unchanged_since(self, backup: schema.Backup, backup_files: List[schema.File], scan_result: _ScanResult) -> bool:
+		"""
+		:return: if the files of the backup are exactly the same as the scanned files, compared by stat
+		"""
+		if sorted(backup.targets) != sorted(scan_result.root_targets) or len(backup_files) != len(scan_result.all_files):
+			return False
+
+		file_stats: Dict[str, tuple] = {
+			file.path: (file.mode, file.blob_raw_size, file.mtime, file.uid, file.gid)
+			for file in backup_files
+		}
+		for file_entry in scan_result.all_files:
+			size = file_entry.st_size if file_entry.is_file() else None
+			key = (file_entry.st_mode, size, file_entry.st_mtime_ns // 1000, file_entry.st_uid, file_entry.st_gid)
+			if file_stats.get(self.__file_path_to_db_path(file_entry.path)) != key:
+				return False
+		return True
+
 	def __pre_calculate_stats(self, scan_result: _ScanResult):
+		self.__pre_calc_result.hashes.clear()
+		self.__pre_calc_result.reused_hashes.clear()
+		self.__pre_calc_result.reused_files.clear()
 		stats = self.__pre_calc_result.stats
 		stats.clear()
 		for file_entry in scan_result.all_files:
-			stats[file_entry.path] = file_entry.stat
-
-	def __reuse_unchanged_files(self, session: DbSession, scan_result: _ScanResult):
-		with self.__time_costs.measure_time_cost(_TimeCostKey.kind_db):
-			backup = session.get_last_backup()
-		if backup is None:
-			return
-
-		@dataclasses.dataclass(frozen=True)
-		class StatKey:
-			path: str
-			size: Optional[int]  # it shouldn't be None, but just in case
-			mode: int
-			uid: int
-			gid: int
-			mtime_us: int
-
-		with self.__time_costs.measure_time_cost(_TimeCostKey.kind_db):
-			backup_files = session.get_backup_files(backup.id)
-
-		stat_to_files: Dict[StatKey, schema.File] = {}
+			stats[file_entry.path] = file_entry
+
+	def __reuse_unchanged_files(self, scan_result: _ScanResult, backup_files: List[schema.File]):
+		"""
+		:param backup_files: files of the last backup
+		"""
+		# plain tuples are used as the keys, since they are much cheaper to create and hash than dataclass instances
+		stat_to_files: Dict[_StatKey, schema.File] = {}
+		content_stat_to_hash: Dict[_ContentStatKey, str] = {}
 		for file in backup_files:
 			if stat.S_ISREG(file.mode):
-				key = StatKey(
-					path=file.path,
-					size=file.blob_raw_size,
-					mode=file.mode,
-					uid=file.uid,
-					gid=file.gid,
-					mtime_us=file.mtime,
-				)
-				stat_to_files[key] = file
+				stat_to_files[(file.path, file.blob_raw_size, file.mtime, file.mode, file.uid, file.gid)] = file
+				if file.blob_hash is not None:
+					content_stat_to_hash[(file.path, file.blob_raw_size, file.mtime)] = file.blob_hash
+
+		reused_files = self.__pre_calc_result.reused_files
+		reused_hashes = self.__pre_calc_result.reused_hashes
+		for file_entry in filter(_ScanResultEntry.is_file, scan_result.all_files):
+			st = file_entry
+			path = self.__file_path_to_db_path(file_entry.path)
+			mtime_us = st.st_mtime_ns // 1000
+			if (file := stat_to_files.get((path, st.st_size, mtime_us, st.st_mode, st.st_uid, st.st_gid))) is not None:
+				reused_files[file_entry.path] = file
+			elif (h := content_stat_to_hash.get((path, st.st_size, mtime_us))) is not None:
+				# only the mode / owner changed, the content is considered unchanged. Reuse the hash, no need to read it again
+				reused_hashes[file_entry.path] = h
+
+	def __fetch_blob_sizes(self, session: DbSession, scan_result: _ScanResult, *, for_pre_calculate_hash: bool):
+		"""
+		:param for_pre_calculate_hash: if the sizes are also used by :meth:`__pre_calculate_hash`.
+		If not, only the large files look up the size cache, see :meth:`__create_file`
+		"""
+		min_size = -1 if for_pre_calculate_hash else _HASH_ONCE_SIZE_THRESHOLD
+		all_sizes: Set[int] = {
+			file_entry.st_size
+			for file_entry in scan_result.all_files
+			if file_entry.is_file() and file_entry.st_size > min_size and file_entry.path not in self.__pre_calc_result.reused_files
+		}
+		with self.__time_costs.measure_time_cost(_TimeCostKey.kind_db):
+			self.__blob_by_size_cache.update(session.has_blob_with_size_batched(list(all_sizes)))
 
-		for file_entry in scan_result.all_files:
-			if file_entry.is_file():
-				key = StatKey(
-					path=self.__file_path_to_db_path(file_entry.path),
-					size=file_entry.stat.st_size,
-					mode=file_entry.stat.st_mode,
-					uid=file_entry.stat.st_uid,
-					gid=file_entry.stat.st_gid,
-					mtime_us=file_entry.stat.st_mtime_ns // 1000
-				)
-				if (file := stat_to_files.get(key)) is not None:
-					self.__pre_calc_result.reused_files[file_entry.path] = file
-
-	def __pre_calculate_hash(self, session: DbSession, scan_result: _ScanResult):
+	def __pre_calculate_hash(self, scan_result: _ScanResult):
 		hashes = self.__pre_calc_result.hashes
-		hashes.clear()
-
+		reused_files, reused_hashes = self.__pre_calc_result.reused_files, self.__pre_calc_result.reused_hashes
 		file_entries_to_hash: List[_ScanResultEntry] = [
 			file_entry
 			for file_entry in scan_result.all_files
-			if file_entry.is_file() and file_entry.path not in self.__pre_calc_result.reused_files
+			if file_entry.is_file() and file_entry.path not in reused_files and file_entry.path not in reused_hashes
 		]
+		# hash in the inode order, which roughly matches the on-disk layout, to reduce random seeks on HDDs
+		file_entries_to_hash.sort(key=lambda e: (e.st_dev, e.st_ino))
 
-		all_sizes: Set[int] = {file_entry.stat.st_size for file_entry in file_entries_to_hash}
-		existed_sizes = session.has_blob_with_size_batched(list(all_sizes))
-		self.__blob_by_size_cache.update(existed_sizes)
+		existed_sizes = self.__blob_by_size_cache
+		hash_method = DbAccess.get_hash_method()
 
-		def hash_worker(pth: Path):
-			hashes[pth] = hash_utils.calc_file_hash(pth)
+		def hash_worker(paths: List[Path]):
+			for pth in paths:
+				hashes[pth] = hash_utils.calc_file_hash(pth, hash_method=hash_method)
 
 		with self.__time_costs.measure_time_cost(_TimeCostKey.kind_io_read):
 			with FailFastBlockingThreadPool(name='hasher') as pool:
+				# small files are grouped into one task, to amortize the per-task overhead of the pool
+				batch: List[Path] = []
+				batch_bytes = 0
 				for file_entry in file_entries_to_hash:
-					if existed_sizes[file_entry.stat.st_size]:
+					if existed_sizes[file_entry.st_size]:
 						# we need to hash the file, sooner or later
-						pool.submit(hash_worker, file_entry.path)
+						batch.append(file_entry.path)
+						batch_bytes += file_entry.st_size
+						if len(batch) >= _HASH_TASK_MAX_FILE_COUNT or batch_bytes >= _HASH_TASK_MAX_BYTES:
+							pool.submit(hash_worker, batch)
+							batch, batch_bytes = [], 0
 					else:
 						pass  # will use hash_once policy
+				if len(batch) > 0:
+					pool.submit(hash_worker, batch)
 
 	@functools.cached_property
 	def __temp_path(self) -> Path:
@@ -427,18 +480,29 @@ class CreateBackupAction(CreateBackupActionBase):
 		p.mkdir(parents=True, exist_ok=True)
 		return p
 
-	def __get_or_create_blob(self, session: DbSession, src_path: Path, st: os.stat_result) -> Generator[Any, Any, Tuple[schema.Blob, os.stat_result]]:
+	@contextlib.contextmanager
+	def __make_temp_file(self, src_path_str: str) -> Generator[Path, None, None]:
+		# the builtin 64-bit str hash is good enough to tell the files apart within a process
+		src_path_tag = format(hash(src_path_str) & 0xFFFF_FFFF_FFFF_FFFF, '016x')
+		temp_file_name = f'blob_{os.getpid()}_{threading.current_thread().ident}_{src_path_tag}.tmp'
+		temp_file_path = self.__temp_path / temp_file_name
+		try:
+			yield temp_file_path
+		finally:
+			self._remove_file(temp_file_path, what='temp_file')
+
+	def __bp_rba(self, h: str) -> Path:
+		"""
+		bp_rba: blob path, roll back add
+		Get blob path by hash, and add the blob path to the rollbacker
+		Commonly used right before creating the blob file
+		"""
+		bp = blob_utils.get_blob_path(h)
+		self._add_remove_file_rollbacker(bp)
+		return bp
+
+	def __get_or_create_blob(self, session: DbSession, src_path: Path, st: _FileStat) -> Generator[Any, Any, Tuple[schema.Blob, _FileStat]]:
 		src_path_str = repr(src_path.as_posix())
-		src_path_md5 = hashlib.md5(src_path_str.encode('utf8')).hexdigest()
-
-		@contextlib.contextmanager
-		def make_temp_file() -> Generator[Path, None, None]:
-			temp_file_name = f'blob_{os.getpid()}_{threading.current_thread().ident}_{src_path_md5}.tmp'
-			temp_file_path = self.__temp_path / temp_file_name
-			try:
-				yield temp_file_path
-			finally:
-				self._remove_file(temp_file_path, what='temp_file')
 
 		def attempt_once(last_chance: bool = False) -> Generator[Any, Any, schema.Blob]:
 			def log_and_raise_blob_file_changed(msg: str) -> NoReturn:
@@ -446,12 +510,7 @@ class CreateBackupAction(CreateBackupActionBase):
 				raise _BlobFileChanged(msg)
 
 			compress_method: CompressMethod = self.config.backup.get_compress_method_from_size(st.st_size)
-			can_copy_on_write = (
-					file_utils.HAS_COPY_FILE_RANGE and
-					compress_method == CompressMethod.plain and
-					self.__blob_store_in_cow_fs and
-					st.st_dev == self.__blob_store_st.st_dev
-			)
+			can_copy_on_write = compress_method == CompressMethod.plain and st.st_dev == self.__cow_copy_st_dev
 
 			policy: Optional[_BlobCreatePolicy] = None
 			blob_hash: Optional[str] = None
@@ -459,6 +518,10 @@ class CreateBackupAction(CreateBackupActionBase):
 			raw_size: Optional[int] = None
 			stored_size: Optional[int] = None
 			pre_calc_hash = self.__pre_calc_result.hashes.pop(src_path, None)
+			# only a hash calculated from the file content in this run can skip the hashing during the copy
+			pre_calc_hash_verified = pre_calc_hash is not None
+			if pre_calc_hash is None:
+				pre_calc_hash = self.__pre_calc_result.reused_hashes.pop(src_path, None)
 
 			if last_chance:
 				policy = _BlobCreatePolicy.copy_hash
@@ -476,12 +539,10 @@ class CreateBackupAction(CreateBackupActionBase):
 					blob_hash = hash_utils.calc_bytes_hash(blob_content)
 				elif st.st_size > _HASH_ONCE_SIZE_THRESHOLD:
 					if (exist := self.__blob_by_size_cache.get(st.st_size)) is None:
-						# existence is unknown yet
-						yield BlobBySizeFetcher.Req(st.st_size)
-						can_hash_once = self.__blob_by_size_cache[st.st_size] is False
-					else:
-						can_hash_once = exist is False
-					if can_hash_once:
+						# the file size has changed since the scan, which is rare. Just query it directly
+						with self.__time_costs.measure_time_cost(_TimeCostKey.kind_db):
+							exist = self.__blob_by_size_cache[st.st_size] = session.has_blob_with_size(st.st_size)
+					if not exist:
 						# it's certain that this blob is unique, but notes: the following code
 						# cannot be interrupted (yield), or other generator could make a same blob
 						policy = _BlobCreatePolicy.hash_once
@@ -511,25 +572,21 @@ class CreateBackupAction(CreateBackupActionBase):
 				if blob_hash is not None and new_hash is not None and new_hash != blob_hash:
 					log_and_raise_blob_file_changed('Blob hash mismatch, previous: {}, current: {}'.format(blob_hash, new_hash))
 
-			def bp_rba(h: str) -> Path:
-				"""
-				bp_rba: blob path, roll back add
-				Get blob path by hash, and add the blob path to the rollbacker
-				Commonly used right before creating the blob file
-				"""
-				bp = blob_utils.get_blob_path(h)
-				self._add_remove_file_rollbacker(bp)
-				return bp
-
 			compressor = Compressor.create(compress_method)
 			if policy == _BlobCreatePolicy.copy_hash:
 				# copy to temp file, calc hash, then compress to blob store
 				misc_utils.assert_true(blob_hash is None, 'blob_hash should not be calculated')
-				with make_temp_file() as temp_file_path:
-					with self.__time_costs.measure_time_cost(_TimeCostKey.kind_io_copy):
-						file_utils.copy_file_fast(src_path, temp_file_path, open_r_func=_SourceFileNotFound.open_rb)
-					with self.__time_costs.measure_time_cost(_TimeCostKey.kind_io_read):
-						blob_hash = hash_utils.calc_file_hash(temp_file_path)
+				with self.__make_temp_file(src_path_str) as temp_file_path:
+					if st.st_dev == self.__cow_copy_st_dev:
+						# the temp dir is next to the blob store, so it's a nearly free COW copy. Hash the copied file afterward
+						with self.__time_costs.measure_time_cost(_TimeCostKey.kind_io_copy):
+							file_utils.copy_file_fast(src_path, temp_file_path, open_r_func=_SourceFileNotFound.open_rb)
+						with self.__time_costs.measure_time_cost(_TimeCostKey.kind_io_read):
+							blob_hash = hash_utils.calc_file_hash(temp_file_path)
+					else:
+						# copy and hash in one pass, so the source file only needs to be read once
+						with self.__time_costs.measure_time_cost(_TimeCostKey.kind_io_copy):
+							blob_hash = file_utils.copy_file_and_hash(src_path, temp_file_path, open_r_func=_SourceFileNotFound.open_rb).hash
 
 					misc_utils.assert_true(last_chance, 'only last_chance=True is allowed for the copy_hash policy')
 					if (cache := self.__blob_by_hash_cache.get(blob_hash)) is not None:
@@ -538,7 +595,7 @@ class CreateBackupAction(CreateBackupActionBase):
 					if (cache := self.__blob_by_hash_cache.get(blob_hash)) is not None:
 						return cache
 
-					blob_path = bp_rba(blob_hash)
+					blob_path = self.__bp_rba(blob_hash)
 					with self.__time_costs.measure_time_cost(_TimeCostKey.kind_io_copy):
 						cr = compressor.copy_compressed(temp_file_path, blob_path, calc_hash=False)
 					raw_size, stored_size = cr.read_size, cr.write_size
@@ -546,13 +603,13 @@ class CreateBackupAction(CreateBackupActionBase):
 			elif policy == _BlobCreatePolicy.hash_once:
 				# read once, compress+hash to temp file, then move
 				misc_utils.assert_true(blob_hash is None, 'blob_hash should not be calculated')
-				with make_temp_file() as temp_file_path:
+				with self.__make_temp_file(src_path_str) as temp_file_path:
 					with self.__time_costs.measure_time_cost(_TimeCostKey.kind_io_copy):
 						cr = compressor.copy_compressed(src_path, temp_file_path, calc_hash=True, open_r_func=_SourceFileNotFound.open_rb)
 					check_changes(cr.read_size, None)  # the size must be unchanged, to satisfy the uniqueness
 
 					raw_size, blob_hash, stored_size = cr.read_size, cr.read_hash, cr.write_size
-					blob_path = bp_rba(blob_hash)
+					blob_path = self.__bp_rba(blob_hash)
 
 					# reference: shutil.move, but os.replace is used
 					try:
@@ -567,7 +624,7 @@ class CreateBackupAction(CreateBackupActionBase):
 
 			else:
 				misc_utils.assert_true(blob_hash is not None, 'blob_hash is None')
-				blob_path = bp_rba(blob_hash)
+				blob_path = self.__bp_rba(blob_hash)
 
 				if policy == _BlobCreatePolicy.read_all:
 					# the file content is already in memory, just write+compress to blob store
@@ -587,10 +644,20 @@ class CreateBackupAction(CreateBackupActionBase):
 						check_changes(sah.size, sah.hash)
 					else:
 						# copy+compress+hash to blob store
+						# if the hash is pre-calculated in this run, skip the hashing, and use the mtime to check if the file was changed since the scan.
+						# A hash reused from the last backup has never been checked against the current content, so it must be verified by hashing
+						verify_by_mtime = pre_calc_hash_verified
 						with self.__time_costs.measure_time_cost(_TimeCostKey.kind_io_copy):
-							cr = compressor.copy_compressed(src_path, blob_path, calc_hash=True, open_r_func=_SourceFileNotFound.open_rb)
+							cr = compressor.copy_compressed(src_path, blob_path, calc_hash=not verify_by_mtime, open_r_func=_SourceFileNotFound.open_rb)
 						raw_size, stored_size = cr.read_size, cr.write_size
-						check_changes(cr.read_size, cr.read_hash)
+						if verify_by_mtime:
+							with _SourceFileNotFound.wrap(src_path), self.__time_costs.measure_time_cost(_TimeCostKey.kind_fs):
+								new_mtime_ns = src_path.lstat().st_mtime_ns
+							if new_mtime_ns != st.st_mtime_ns:
+								log_and_raise_blob_file_changed('Blob mtime mismatch, previous: {}, current: {}'.format(st.st_mtime_ns, new_mtime_ns))
+							check_changes(cr.read_size, None)
+						else:
+							check_changes(cr.read_size, cr.read_hash)
 				else:
 					raise AssertionError('bad policy {!r}'.format(policy))
 
@@ -610,17 +677,8 @@ class CreateBackupAction(CreateBackupActionBase):
 			is_last_attempt = retry_cnt == _BLOB_FILE_CHANGED_RETRY_COUNT
 			if i > 0:
 				self.logger.debug('Try to create blob {} (attempt {} / {})'.format(src_path_str, retry_cnt, _BLOB_FILE_CHANGED_RETRY_COUNT))
-			gen = attempt_once(last_chance=is_last_attempt)
 			try:
-				query = gen.send(None)
-				while True:
-					result = yield query
-					query = gen.send(result)
-			except StopIteration as e:  # ok
-				blob: schema.Blob = e.value
-				self.__blob_by_size_cache[blob.raw_size] = True
-				self.__blob_by_hash_cache[blob.hash] = blob
-				return blob, st
+				blob: schema.Blob = yield from attempt_once(last_chance=is_last_attempt)
 			except _BlobFileChanged:
 				(self.logger.warning if is_last_attempt else self.logger.debug)('Blob {} stat has changed, has someone modified it? {} (attempt {} / {})'.format(
 					src_path_str, 'No more retry' if is_last_attempt else 'Retrying', retry_cnt, _BLOB_FILE_CHANGED_RETRY_COUNT
@@ -629,6 +687,14 @@ class CreateBackupAction(CreateBackupActionBase):
 			except Exception as e:
 				self.logger.error('Create blob for file {} failed (attempt {} / {}): {}'.format(src_path_str, retry_cnt, _BLOB_FILE_CHANGED_RETRY_COUNT, e))
 				raise
+			else:  # ok
+				self.__blob_by_size_cache[blob.raw_size] = True
+				self.__blob_by_hash_cache[blob.hash] = blob
+				if st.st_size >= _DROP_FILE_CACHE_SIZE_THRESHOLD:
+					# the source file will not be read again, don't let its content pollute the page cache
+					with self.__time_costs.measure_time_cost(_TimeCostKey.kind_fs):
+						file_utils.drop_file_cache(src_path)
+				return blob, st
 
 		self.logger.error('All blob copy attempts failed since the file {} keeps changing'.format(src_path_str))
 		raise VolatileBlobFile('blob file {} keeps changing'.format(src_path_str))
@@ -657,15 +723,8 @@ class CreateBackupAction(CreateBackupActionBase):
 		blob: Optional[schema.Blob] = None
 		content: Optional[bytes] = None
 		if stat.S_ISREG(st.st_mode):
-			gen = self.__get_or_create_blob(session, path, st)
-			try:
-				query = gen.send(None)
-				while True:
-					result = yield query
-					query = gen.send(result)
-			except StopIteration as e:
-				blob, st = e.value
-				# notes: st.st_size might be incorrect, use blob.raw_size instead
+			blob, st = yield from self.__get_or_create_blob(session, path, st)
+			# notes: st.st_size might be incorrect, use blob.raw_size instead
 		elif stat.S_ISDIR(st.st_mode):
 			pass
 		elif stat.S_ISLNK(st.st_mode):
@@ -693,6 +752,26 @@ class CreateBackupAction(CreateBackupActionBase):
 		))
 		with self.__time_costs.measure_time_cost(_TimeCostKey.stage_scan_files):
 			scan_result = self.__scan_files()
+
+		# the last backup and its files, loaded once for both the unchanged check and the stat unchanged file reusing
+		last_backup: Optional[schema.Backup] = None
+		last_backup_files: List[schema.File] = []
+		if self.config.backup.reuse_stat_unchanged_file:
+			with self.__time_costs.measure_time_cost(_TimeCostKey.stage_reuse_unchanged_files, _TimeCostKey.kind_db):
+				if (last_backup := session.get_last_backup()) is not None:
+					last_backup_files = session.get_backup_files(last_backup.id)
+
+		if self.skip_if_unchanged and last_backup is not None:
+			# only a regular backup counts. A temporary or hidden backup is not a restore candidate, and might get pruned later
+			last_backup_tags = BackupTags(last_backup.tags)
+			if (
+					not last_backup_tags.is_temporary_backup() and not last_backup_tags.is_hidden() and
+					self.__is_unchanged_since(last_backup, last_backup_files, scan_result)
+			):
+				self.logger.info('All {} files are unchanged since the last backup #{}, skip creating a new backup'.format(len(scan_result.all_files), last_backup.id))
+				self.__skipped_as_unchanged = True
+				return BackupInfo.of(last_backup)
+
 		backup = session.create_backup(
 			creator=str(self.creator),
 			comment=self.comment,
@@ -707,18 +786,23 @@ class CreateBackupAction(CreateBackupActionBase):
 		self.__pre_calculate_stats(scan_result)
 		if self.config.backup.reuse_stat_unchanged_file:
 			with self.__time_costs.measure_time_cost(_TimeCostKey.stage_reuse_unchanged_files):
-				self.__reuse_unchanged_files(session, scan_result)
+				self.__reuse_unchanged_files(scan_result, last_backup_files)
 			self.logger.info('Reused {} / {} stat unchanged files'.format(len(self.__pre_calc_result.reused_files), len(scan_result.all_files)))
-		if self.config.get_effective_concurrency() > 1:
+		pre_calculate_hash = self.config.get_effective_concurrency() > 1
+		with self.__time_costs.measure_time_cost(_TimeCostKey.stage_fetch_blob_sizes):
+			self.__fetch_blob_sizes(session, scan_result, for_pre_calculate_hash=pre_calculate_hash)
+		if pre_calculate_hash:
 			with self.__time_costs.measure_time_cost(_TimeCostKey.stage_pre_calculate_hash):
-				self.__pre_calculate_hash(session, scan_result)
+				self.__pre_calculate_hash(scan_result)
 			self.logger.info('Pre-calculate all file hash done')
 
 		with self.__time_costs.measure_time_cost(_TimeCostKey.stage_prepare_blob_store, _TimeCostKey.kind_fs):
 			blob_utils.prepare_blob_directories()
 			bs_path = blob_utils.get_blob_store()
-			self.__blob_store_st = bs_path.stat()
-			self.__blob_store_in_cow_fs = file_utils.does_fs_support_cow(bs_path)
+			if file_utils.HAS_COPY_FILE_RANGE and file_utils.does_fs_support_cow(bs_path):
+				self.__cow_copy_st_dev = bs_path.stat().st_dev
+			else:
+				self.__cow_copy_st_dev = None
 
 		@functools.lru_cache(None)
 		def get_skip_missing_source_file_patterns() -> pathspec.GitIgnoreSpec:
@@ -727,7 +811,7 @@ class CreateBackupAction(CreateBackupActionBase):
 		def should_skip_missing_source_file(src_file_path: Path) -> bool:
 			if self.config.backup.creation_skip_missing_file:
 				try:
-					rel_path = src_file_path.relative_to(self.__source_path)
+					rel_path = self.__file_path_to_db_path(src_file_path)
 				except ValueError:
 					self.logger.error("Path {!r} is not inside the source path {!r}".format(str(src_file_path), str(self.__source_path)))
 				else:
@@ -735,30 +819,55 @@ class CreateBackupAction(CreateBackupActionBase):
 			return False
 
 		files = []
-		with self.__time_costs.measure_time_cost(_TimeCostKey.stage_create_files):
-			schedule_queue: Deque[Tuple[Generator[BqmReq, Optional[BqmRsp], schema.File], Optional[BqmRsp]]] = collections.deque()
-			for file_entry in scan_result.all_files:
-				schedule_queue.append((self.__create_file(session, file_entry.path), None))
-			while len(schedule_queue) > 0:
-				gen, value = schedule_queue.popleft()
-				try:
-					def callback(query_rsp: BqmRsp, g=gen):
-						schedule_queue.appendleft((g, query_rsp))
 
+		def create_files(file_entries: List[_ScanResultEntry]):
+			# Generators are stored in a slab, and referenced by their index. Resumable generators are pushed to the ready stack,
+			# which has a higher priority than the not-started ones, so the in-progress files are finished first
+			gens: List[Optional[Generator[BqmReq, Optional[BqmRsp], schema.File]]] = [self.__create_file(session, file_entry.path) for file_entry in file_entries]
+			rsps: List[Optional[BqmRsp]] = [None] * len(gens)
+			callbacks: List[Optional[Callable[[BqmRsp], None]]] = [None] * len(gens)
+			ready_stack: List[int] = []
+			next_new_idx = 0
+
+			def on_query_rsp(slot_idx: int, query_rsp: BqmRsp):
+				rsps[slot_idx] = query_rsp
+				ready_stack.append(slot_idx)
+
+			while True:
+				if len(ready_stack) > 0:
+					idx = ready_stack.pop()
+				elif next_new_idx < len(gens):
+					idx = next_new_idx
+					next_new_idx += 1
+				else:
+					break
+
+				gen, value = gens[idx], rsps[idx]
+				rsps[idx] = None
+				try:
 					query_req = gen.send(value)
+					if (callback := callbacks[idx]) is None:
+						callback = callbacks[idx] = functools.partial(on_query_rsp, idx)
 					self.__batch_query_manager.query(query_req, callback)
 				except StopIteration as e:
+					gens[idx] = callbacks[idx] = None
 					files.append(misc_utils.ensure_type(e.value, schema.File))
 				except _SourceFileNotFound as e:
+					gens[idx] = callbacks[idx] = None
 					if should_skip_missing_source_file(e.file_path):
 						self.logger.warning('Backup source file {!r} not found, suppressed and skipped by config'.format(str(e.file_path)))
 					else:
 						raise
 
 				self.__batch_query_manager.flush_if_needed()
-				if len(schedule_queue) == 0:
+				if len(ready_stack) == 0 and next_new_idx >= len(gens):
 					self.__batch_query_manager.flush()
 
+		with self.__time_costs.measure_time_cost(_TimeCostKey.stage_create_files):
+			# Files are processed in fixed-size windows, so the amount of alive generators is bounded
+			for window in collection_utils.slicing_iterate(scan_result.all_files, _CREATE_FILE_WINDOW_SIZE):
+				create_files(window)
+
 		with self.__time_costs.measure_time_cost(_TimeCostKey.stage_finalize):
 			self._finalize_backup_and_files(session, backup, files)
 		info = BackupInfo.of(backup)
@@ -774,20 +883,21 @@ class CreateBackupAction(CreateBackupActionBase):
 		# TODO: prevent re-run
 		self.__blob_by_size_cache.clear()
 		self.__blob_by_hash_cache.clear()
+		self.__skipped_as_unchanged = False
 		self.__time_costs.reset()
-		with self.__time_costs.measure_time_cost(*_TimeCostKey):
-			pass
 		action_start_ts = time.time()
 
 		try:
 			session_context = DbAccess.open_session()
 			with session_context as session:
-				self.__batch_query_manager = BatchQueryManager(session, self.__blob_by_size_cache, self.__blob_by_hash_cache, self.__time_costs)
+				self.__batch_query_manager = BatchQueryManager(session, self.__blob_by_hash_cache, self.__time_costs)
 				info = self.__create_backup(session_context, session)
 		except Exception as e:
 			self._apply_blob_rollback()
 			raise e
 		else:
+			if self.__skipped_as_unchanged:
+				return info
 			s = self.get_new_blobs_summary()
 			self.logger.info('Create backup #{} done, +{} blobs (size {} / {})'.format(
 				info.id, s.count, ByteCount(s.stored_size).auto_str(), ByteCount(s.raw_size).auto_str(),
@@ -796,8 +906,14 @@ class CreateBackupAction(CreateBackupActionBase):
 
 			return info
 
+	def is_skipped_as_unchanged(self) -> bool:
+		"""
+		:return: if no new backup is created since nothing changed, see the skip_if_unchanged argument
+		"""
+		return self.__skipped_as_unchanged
+
 	def __log_costs(self, actual_cost: float):
-		if not (self.config.debug and self.logger.isEnabledFor(logging.DEBUG)):
+		if not self.__log_costs_enabled:
 			return
 
 		def log_one_key(what: str, cost: float):
@@ -807,9 +923,10 @@ class CreateBackupAction(CreateBackupActionBase):
 		self.logger.debug('{} run costs'.format(self.__class__.__name__))
 		log_one_key('ACTUAL', actual_cost)
 
-		all_costs = self.__time_costs.get_costs()
-		kind_costs = {k: v for k, v in all_costs.items() if k.name.startswith('kind_')}
-		stage_costs = {k: v for k, v in all_costs.items() if k.name.startswith('stage_')}
+		kind_costs: Dict[_TimeCostKey, float] = {}
+		stage_costs: Dict[_TimeCostKey, float] = {}
+		for k, v in self.__time_costs.get_costs().items():
+			(kind_costs if k in _TIME_COST_KIND_KEYS else stage_costs)[k] = v
 
 		self.logger.debug('Kind costs')
 		for k, v in kind_costs.items():
@@ -1,7 +1,6 @@
-import functools
 from abc import ABC
 from pathlib import Path
-from typing import List, Callable, Optional
+from typing import List, Optional
 
 from typing_extensions import override, Unpack
 
@@ -18,7 +17,7 @@ class CreateBackupActionBase(Action[BackupInfo], ABC):
 		super().__init__()
 		self.__new_blobs: List[BlobInfo] = []
 		self.__new_blobs_summary: Optional[BlobListSummary] = None
-		self.__blobs_rollbackers: List[Callable] = []
+		self.__rollback_file_paths: List[Path] = []  # files to remove on rollback
 
 	def _remove_file(self, file_to_remove: Path, *, what: str = 'rollback'):
 		try:
@@ -27,14 +26,14 @@ class CreateBackupActionBase(Action[BackupInfo], ABC):
 			self.logger.error('({}) remove file {!r} failed: {}'.format(what, file_to_remove, e))
 
 	def _add_remove_file_rollbacker(self, file_to_remove: Path):
-		self.__blobs_rollbackers.append(functools.partial(self._remove_file, file_to_remove=file_to_remove))
+		self.__rollback_file_paths.append(file_to_remove)
 
 	def _apply_blob_rollback(self):
-		if len(self.__blobs_rollbackers) > 0:
+		if len(self.__rollback_file_paths) > 0:
 			self.logger.warning('Error occurs during backup creation, applying rollback')
-			for rollback_func in self.__blobs_rollbackers:
-				rollback_func()
-			self.__blobs_rollbackers.clear()
+			for file_path in self.__rollback_file_paths:
+				self._remove_file(file_path)
+			self.__rollback_file_paths.clear()
 
 	def _create_blob(self, session: DbSession, **kwargs: Unpack[DbSession.CreateBlobKwargs]) -> schema.Blob:
 		blob = session.create_and_add_blob(**kwargs)
@@ -64,4 +63,4 @@ class CreateBackupActionBase(Action[BackupInfo], ABC):
 	def run(self) -> None:
 		self.__new_blobs.clear()
 		self.__new_blobs_summary = None
-		self.__blobs_rollbackers.clear()
+		self.__rollback_file_paths.clear()
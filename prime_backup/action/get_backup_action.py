@@ -1,3 +1,8 @@
+import collections
+import threading
+import time
+from typing import Optional, Tuple, List, Dict
+
 from typing_extensions import override
 
 from prime_backup.action import Action
@@ -5,18 +10,87 @@ from prime_backup.db.access import DbAccess
 from prime_backup.types.backup_info import BackupInfo
 from prime_backup.utils import misc_utils
 
+_CACHE_CAPACITY = 64
+_CACHE_TTL = 10  # in seconds. The db might be modified by other processes, e.g. the cli
+
+
+class _BackupInfoCache:
+	"""
+	backup id -> BackupInfo without files, invalidated on db data version change or expiry
+	"""
+	def __init__(self, capacity: int, ttl: float):
+		self.__capacity = capacity
+		self.__ttl = ttl
+		self.__data: 'collections.OrderedDict[int, Tuple[int, float, BackupInfo]]' = collections.OrderedDict()
+		self.__lock = threading.Lock()
+
+	def get(self, backup_id: int) -> Optional[BackupInfo]:
+		with self.__lock:
+			if (item := self.__data.get(backup_id)) is None:
+				return None
+			data_version, expire_at, backup = item
+			if data_version != DbAccess.get_data_version() or time.monotonic() >= expire_at:
+				self.__data.pop(backup_id)
+				return None
+			self.__data.move_to_end(backup_id)
+			return backup
+
+	def set(self, data_version: int, backup: BackupInfo):
+		"""
+		:param data_version: the db data version before the backup is queried
+		"""
+		with self.__lock:
+			self.__data[backup.id] = (data_version, time.monotonic() + self.__ttl, backup)
+			self.__data.move_to_end(backup.id)
+			while len(self.__data) > self.__capacity:
+				self.__data.popitem(last=False)
+
+
+_backup_info_cache = _BackupInfoCache(_CACHE_CAPACITY, _CACHE_TTL)
+
 
 class GetBackupAction(Action[BackupInfo]):
-	def __init__(self, backup_id: int, *, with_files: bool = False):
+	def __init__(self, backup_id: int, *, with_files: bool = False, cached: bool = False):
+		"""
+		:param cached: use the shared backup info cache. The result might be stale for a few seconds,
+		if the db is modified by other processes, so only use it for displaying
+		"""
 		super().__init__()
 		self.backup_id = misc_utils.ensure_type(backup_id, int)
 		self.with_files = with_files
+		self.cached = cached and not with_files
 
 	@override
 	def run(self) -> BackupInfo:
-		with DbAccess.open_session() as session:
-			backup = session.get_backup(self.backup_id)
-			if self.with_files:
-				return BackupInfo.of(backup, backup_files=session.get_backup_files(backup))
-			else:
+		if not self.cached:
+			with DbAccess.open_session() as session:
+				backup = session.get_backup(self.backup_id)
+				if self.with_files:
+					return BackupInfo.of(backup, backup_files=session.get_backup_files(backup))
 				return BackupInfo.of(backup)
+
+		if (backup_info := _backup_info_cache.get(self.backup_id)) is not None:
+			return backup_info
+
+		data_version = DbAccess.get_data_version()
+		with DbAccess.open_session() as session:
+			backup_info = BackupInfo.of(session.get_backup(self.backup_id))
+		_backup_info_cache.set(data_version, backup_info)
+		return backup_info
+
+
+class GetBackupsAction(Action[Dict[int, Optional[BackupInfo]]]):
+	def __init__(self, backup_ids: List[int]):
+		"""
+		:param backup_ids: the backups to get. Backups that do not exist are mapped to None in the result
+		"""
+		super().__init__()
+		self.backup_ids = [misc_utils.ensure_type(backup_id, int) for backup_id in backup_ids]
+
+	@override
+	def run(self) -> Dict[int, Optional[BackupInfo]]:
+		with DbAccess.open_session() as session:
+			return {
+				backup_id: BackupInfo.of(backup) if backup is not None else None
+				for backup_id, backup in session.get_backups_opt(self.backup_ids).items()
+			}
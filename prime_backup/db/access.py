@@ -1,9 +1,10 @@
 import contextlib
+import itertools
 from pathlib import Path
 from typing import Optional, Generator
 
-from sqlalchemy import create_engine, Engine
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine, Engine, event
+from sqlalchemy.orm import Session, ORMExecuteState
 
 from prime_backup.config.config import Config
 from prime_backup.db import db_constants
@@ -11,6 +12,8 @@ from prime_backup.db.migration import DbMigration
 from prime_backup.db.session import DbSession
 from prime_backup.types.hash_method import HashMethod
 
+_SESSION_INFO_KEY_WRITTEN = 'prime_backup_written'
+
 
 class DbAccess:
 	__engine: Optional[Engine] = None
@@ -18,6 +21,9 @@ class DbAccess:
 
 	__hash_method: Optional[HashMethod] = None
 
+	__data_version_counter = itertools.count(1)
+	__data_version: int = 0
+
 	@classmethod
 	def init(cls, create: bool, migrate: bool):
 		"""
@@ -30,6 +36,7 @@ class DbAccess:
 		db_path = db_dir / db_constants.DB_FILE_NAME
 		cls.__engine = create_engine('sqlite:///' + str(db_path))
 		cls.__db_file_path = db_path
+		cls.__data_version = next(cls.__data_version_counter)
 
 		migration = DbMigration(cls.__engine, db_dir, db_path, config.temp_path)
 		migration.check_and_migrate(create=create, migrate=migrate)
@@ -75,11 +82,36 @@ class DbAccess:
 	def get_hash_method(cls) -> HashMethod:
 		return cls.__ensure_not_none(cls.__hash_method)
 
+	@classmethod
+	def get_data_version(cls) -> int:
+		"""
+		The data version gets increased after every session that has written something to the db,
+		so it can be used to invalidate the caches of db data
+		"""
+		return cls.__data_version
+
+	@staticmethod
+	def __on_session_after_flush(session: Session, _flush_context):
+		session.info[_SESSION_INFO_KEY_WRITTEN] = True
+
+	@staticmethod
+	def __on_session_do_orm_execute(state: ORMExecuteState):
+		if not state.is_select:  # e.g. bulk delete
+			state.session.info[_SESSION_INFO_KEY_WRITTEN] = True
+
 	@classmethod
 	@contextlib.contextmanager
 	def open_session(cls) -> Generator['DbSession', None, None]:
-		with Session(cls.__ensure_engine()) as session, session.begin():
-			yield DbSession(session, cls.__db_file_path)
+		with Session(cls.__ensure_engine()) as session:
+			# listen on the session instance only, so sessions of other plugins in the same process are not affected
+			event.listen(session, 'after_flush', cls.__on_session_after_flush)
+			event.listen(session, 'do_orm_execute', cls.__on_session_do_orm_execute)
+			try:
+				with session.begin():
+					yield DbSession(session, cls.__db_file_path)
+			finally:
+				if session.info.get(_SESSION_INFO_KEY_WRITTEN):
+					cls.__data_version = next(cls.__data_version_counter)
 
 	@classmethod
 	@contextlib.contextmanager
@@ -748,7 +748,7 @@ class DbSession:
 		files_delta = self.get_fileset_files(backup.fileset_id_delta)
 		return self.__merge_fileset_files(files_base, files_delta)
 
-	def get_backups(self, backup_ids: List[int]) -> Dict[int, schema.Backup]:
+	def get_backups_opt(self, backup_ids: List[int]) -> Dict[int, Optional[schema.Backup]]:
 		"""
 		:return: a dict, backup id -> Backup. All given ids are in the dict
 		"""
@@ -756,6 +756,14 @@ class DbSession:
 		for view in collection_utils.slicing_iterate(backup_ids, self.__safe_var_limit):
 			for backup in self.session.execute(select(schema.Backup).where(schema.Backup.id.in_(view))).scalars().all():
 				result[backup.id] = backup
+		return result
+
+	def get_backups(self, backup_ids: List[int]) -> Dict[int, schema.Backup]:
+		"""
+		:return: a dict, backup id -> Backup. All given ids are in the dict
+		:raise BackupNotFound
+		"""
+		result = self.get_backups_opt(backup_ids)
 		for backup_id, backup in result.items():
 			if backup is None:
 				raise BackupNotFound(backup_id)
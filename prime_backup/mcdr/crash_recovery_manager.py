@@ -19,7 +19,12 @@ if TYPE_CHECKING:  # pragma: no cover
 
 
 class CrashRecoveryManager:
-	"""In-memory tracker that guards against repeated crash loops."""
+	"""
+	In-memory tracker that guards against repeated crash loops.
+
+	Server events and the recovery task callback come from different threads, so the state is guarded by a lock.
+	The lock only covers the state updates, logging and task scheduling are done outside of it
+	"""
 	def __init__(self, task_manager: 'TaskManager'):
 		self._task_manager = task_manager
 		self._logger = logger.get()
@@ -37,9 +42,10 @@ class CrashRecoveryManager:
 			if return_code == 0:
 				# success resets failure streak immediately
 				self._consecutive_abnormal = 0
-			else:
-				self._consecutive_abnormal += 1
-				self._logger.warning('Server exited abnormally with code %s (%s consecutive)', return_code, self._consecutive_abnormal)
+				return
+			self._consecutive_abnormal += 1
+			consecutive_abnormal = self._consecutive_abnormal
+		self._logger.warning('Server exited abnormally with code %s (%s consecutive)', return_code, consecutive_abnormal)
 
 	def on_server_start(self, server: PluginServerInterface):
 		"""Intercept the boot if the crash threshold is hit."""
@@ -47,11 +53,11 @@ class CrashRecoveryManager:
 			if self._in_progress or self._consecutive_abnormal < 2:
 				return
 			self._in_progress = True
-			self._last_saved_counter = self._consecutive_abnormal
+			self._last_saved_counter = saved_counter = self._consecutive_abnormal
 			self._consecutive_abnormal = 0
 
 		source = server.get_plugin_command_source()
-		self._logger.warning('Crash recovery triggered after %s consecutive abnormal exits', self._last_saved_counter)
+		self._logger.warning('Crash recovery triggered after %s consecutive abnormal exits', saved_counter)
 		task = _CrashRecoveryTask(source, self)
 		self._task_manager.add_task(task)
 
@@ -62,9 +68,9 @@ class CrashRecoveryManager:
 			if succeeded:
 				# successful recovery clears the streak entirely
 				self._last_saved_counter = 0
-			else:
-				self._consecutive_abnormal = max(2, self._last_saved_counter)
-				self._logger.error('Crash recovery failed, counter restored to %s', self._consecutive_abnormal)
+				return
+			self._consecutive_abnormal = consecutive_abnormal = max(2, self._last_saved_counter)
+		self._logger.error('Crash recovery failed, counter restored to %s', consecutive_abnormal)
 
 	def reset(self):
 		"""Forcefully clear internal state, mainly for plugin unload."""
@@ -101,7 +107,7 @@ class _CrashRecoveryTask(HeavyTask[None]):
 				self.broadcast(self.tr('no_previous'))
 				return
 			self.broadcast(self.tr('restore_start', TextComponents.backup_brief(previous_backup)))
-			self._restore(previous_backup.id)
+			self._restore(previous_backup)
 			self._restart_server()
 			self.broadcast(self.tr('completed', TextComponents.backup_id(previous_backup.id)))
 			succeeded = True
@@ -112,22 +118,25 @@ class _CrashRecoveryTask(HeavyTask[None]):
 		"""Create the crash snapshot backup with auto markers."""
 		comment = backup_utils.create_translated_backup_comment('crash_auto_recovery')
 		operator = Operator.pb(PrimeBackupOperatorNames.scheduled_backup)
-		task = CreateBackupTask(self.source, comment, operator=operator)
-		return self.run_subtask(task)
+		task = CreateBackupTask(self.source, comment, operator=operator, skip_if_unchanged=True)
+		backup_id = self.run_subtask(task)
+		if backup_id is not None and task.skipped_as_unchanged:
+			# the world is the same as the latest backup, and no snapshot is created.
+			# Return the id after it, so the latest backup is still a restore candidate, just like there's a snapshot
+			backup_id += 1
+		return backup_id
 
 	def _select_previous_backup(self, current_backup_id: int) -> Optional[BackupInfo]:
 		"""Pick the most recent non-temporary backup preceding the snapshot."""
-		flt = BackupFilter()
-		flt.id_end = current_backup_id - 1
-		flt.sort_order = BackupSortOrder.id_r
-		flt.requires_non_temporary_backup()
-		flt.requires_non_hidden_backup()
+		flt = BackupFilter(id_end=current_backup_id - 1, sort_order=BackupSortOrder.id_r)
+		flt.requires_non_temporary_backup().requires_non_hidden_backup()
 		backups = ListBackupAction(backup_filter=flt, limit=1).run()
 		return backups[0] if backups else None
 
-	def _restore(self, backup_id: int):
+	def _restore(self, backup: BackupInfo):
 		"""Replay the chosen backup without interactive confirmation."""
-		task = RestoreBackupTask(self.source, backup_id, needs_confirm=False, fail_soft=False)
+		# the backup is just selected, pass it through, so the restore task does not need to query it again
+		task = RestoreBackupTask(self.source, needs_confirm=False, fail_soft=False, backup=backup)
 		self.run_subtask(task)
 
 	def _ensure_server_stopped(self):
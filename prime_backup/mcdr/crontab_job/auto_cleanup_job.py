@@ -3,6 +3,7 @@ import time
 from typing import TYPE_CHECKING, List, Optional
 
 from apscheduler.schedulers.base import BaseScheduler
+from mcdreforged.api.all import RTextList
 from typing_extensions import override
 
 from prime_backup.config.config_common import CrontabJobSetting
@@ -11,7 +12,8 @@ from prime_backup.mcdr import mcdr_globals
 from prime_backup.mcdr.crontab_job import CrontabJobEvent, CrontabJobId
 from prime_backup.mcdr.crontab_job.basic_job import BasicCrontabJob
 from prime_backup.mcdr.online_player_counter import OnlinePlayerCounter
-from prime_backup.types.backup_filter import BackupFilter
+from prime_backup.mcdr.text_components import TextComponents
+from prime_backup.types.backup_filter import BackupFilter, BackupSortOrder
 from prime_backup.types.backup_info import BackupInfo
 from prime_backup.types.operator import Operator, PrimeBackupOperatorNames
 from prime_backup.utils.mcdr_utils import broadcast_message
@@ -19,11 +21,21 @@ from prime_backup.utils.mcdr_utils import broadcast_message
 if TYPE_CHECKING:
 	from prime_backup.mcdr.task_manager import TaskManager
 
+# the expire time is usually hours or days, no need to query the expired backups on every tick
+_MIN_SCAN_INTERVAL_US = 60 * 1_000_000
+
 
 class AutoCleanupJob(BasicCrontabJob):
 	def __init__(self, scheduler: BaseScheduler, task_manager: 'TaskManager'):
 		super().__init__(scheduler, task_manager)
 		self.config: ScheduledBackupConfig = self._root_config.scheduled_backup
+		self.__last_scan_us = 0
+
+		# in-memory copies of the cleanup state in the job data store, loaded lazily on first access,
+		# since the job is created before the OnlinePlayerCounter, which inherits the store from the previous plugin instance
+		self.__cleanup_state_loaded = False
+		self.__cleanup_scheduled_time_value: Optional[int] = None
+		self.__cleanup_backup_ids_value: List[int] = []
 
 	@property
 	@override
@@ -41,13 +53,26 @@ class AutoCleanupJob(BasicCrontabJob):
 			jitter: Duration = self.config.jitter
 		return AutoCleanupJobSetting()
 
+	@staticmethod
+	def _now_us() -> int:
+		# the same as the backup timestamp, see DbSession.create_backup
+		return time.time_ns() // 1000
+
 	@property
 	def __store(self) -> dict:
 		return OnlinePlayerCounter.get().job_data_store
 
+	def __load_cleanup_state(self):
+		if not self.__cleanup_state_loaded:
+			store = self.__store
+			self.__cleanup_scheduled_time_value = store.get('auto_cleanup_scheduled_time')
+			self.__cleanup_backup_ids_value = store.get('auto_cleanup_backup_ids', [])
+			self.__cleanup_state_loaded = True
+
 	@property
 	def __cleanup_scheduled_time(self) -> Optional[int]:
-		return self.__store.get('auto_cleanup_scheduled_time')
+		self.__load_cleanup_state()
+		return self.__cleanup_scheduled_time_value
 
 	@__cleanup_scheduled_time.setter
 	def __cleanup_scheduled_time(self, value: Optional[int]):
@@ -55,17 +80,21 @@ class AutoCleanupJob(BasicCrontabJob):
 			self.__store.pop('auto_cleanup_scheduled_time', None)
 		else:
 			self.__store['auto_cleanup_scheduled_time'] = value
+		self.__cleanup_scheduled_time_value = value
 
 	@property
 	def __cleanup_backup_ids(self) -> List[int]:
-		return self.__store.get('auto_cleanup_backup_ids', [])
+		self.__load_cleanup_state()
+		return self.__cleanup_backup_ids_value
 
 	@__cleanup_backup_ids.setter
 	def __cleanup_backup_ids(self, value: List[int]):
 		if not value:
 			self.__store.pop('auto_cleanup_backup_ids', None)
+			value = []
 		else:
 			self.__store['auto_cleanup_backup_ids'] = value
+		self.__cleanup_backup_ids_value = value
 
 	@override
 	def run(self):
@@ -75,7 +104,7 @@ class AutoCleanupJob(BasicCrontabJob):
 		if not mcdr_globals.server.is_server_running():
 			return
 
-		current_time_us = int(time.time() * 1_000_000)
+		current_time_us = self._now_us()
 		expire_time_us = int(self.config.auto_cleanup_expire_time.value * 1_000_000)
 		warning_time_us = int(self.config.auto_cleanup_warning_time.value * 1_000_000)
 
@@ -83,52 +112,53 @@ class AutoCleanupJob(BasicCrontabJob):
 		if scheduled_time is not None:
 			if current_time_us >= scheduled_time:
 				self._execute_cleanup()
-				return
+			# otherwise, the cleanup is still in its warning period, and the expired backups are already collected
+			return
 
+		if current_time_us - self.__last_scan_us < _MIN_SCAN_INTERVAL_US:
+			return
+		self.__last_scan_us = current_time_us
 		expired_backups = self._find_expired_backups(current_time_us, expire_time_us)
 		if not expired_backups:
 			return
 
-		online_players = OnlinePlayerCounter.get().get_online_players()
-		if online_players is None or len(online_players.valid) == 0:
+		ss = OnlinePlayerCounter.get().get_player_record_snapshot()
+		if ss is None or not ss.has_valid_online:
 			self.logger.info(f'Found {len(expired_backups)} expired auto backups, but no valid players online, skipping warning')
 			return
 
-		self.logger.info(f'Found {len(expired_backups)} expired auto backups with {len(online_players.valid)} valid players online')
+		self.logger.info(f'Found {len(expired_backups)} expired auto backups, players: {ss.summary}')
 		self.__cleanup_backup_ids = [backup.id for backup in expired_backups]
 		self.__cleanup_scheduled_time = current_time_us + warning_time_us
 
 		self._broadcast_cleanup_warning(expired_backups)
 
 	def _find_expired_backups(self, current_time_us: int, expire_time_us: int) -> List[BackupInfo]:
+		"""
+		:return: the expired backups, newest first
+		"""
 		from prime_backup.action.list_backup_action import ListBackupAction
 
-		backup_filter = BackupFilter()
-		backup_filter.creator = Operator.pb(PrimeBackupOperatorNames.scheduled_backup)
-
-		list_action = ListBackupAction(backup_filter=backup_filter)
-		backups = list_action.run()
-
-		expired_backups = []
-		for backup in backups:
-			backup_age_us = current_time_us - backup.timestamp_us
-			if backup_age_us > expire_time_us:
-				expired_backups.append(backup)
+		backup_filter = BackupFilter(
+			sort_order=BackupSortOrder.time_r,
+			creator=Operator.pb(PrimeBackupOperatorNames.scheduled_backup),
+			# backup age > expire time  <=>  backup timestamp < current time - expire time
+			timestamp_us_end=current_time_us - expire_time_us - 1,
+		)
 
-		return expired_backups
+		return ListBackupAction(backup_filter=backup_filter).run()
 
 	def _broadcast_cleanup_warning(self, expired_backups: List[BackupInfo]):
 		count = len(expired_backups)
 		prefix = self._root_config.command.prefix
 		if count == 1:
-			backup = expired_backups[0]
-			time_info = f"{backup.date_str}(-{backup.time_delta_text})"
+			time_info = TextComponents.backup_date(expired_backups[0])
 			msg = self.tr('warning_single', time_info, prefix)
 			broadcast_message(msg)
 		else:
-			oldest = min(expired_backups, key=lambda b: b.timestamp_us)
-			newest = max(expired_backups, key=lambda b: b.timestamp_us)
-			time_info = f"{oldest.date_str}到{newest.date_str}"
+			# already sorted by _find_expired_backups
+			newest, oldest = expired_backups[0], expired_backups[-1]
+			time_info = RTextList(TextComponents.backup_date(oldest), ' ~ ', TextComponents.backup_date(newest))
 			msg = self.tr('warning_multiple', time_info, count, prefix)
 			broadcast_message(msg)
 
@@ -175,7 +205,7 @@ class AutoCleanupJob(BasicCrontabJob):
 			return None
 
 		backup_ids = self.__cleanup_backup_ids
-		current_time_us = int(time.time() * 1_000_000)
+		current_time_us = self._now_us()
 		remaining_time_us = scheduled_time - current_time_us
 
 		return {
@@ -189,7 +219,7 @@ class AutoCleanupJob(BasicCrontabJob):
 		if not self.config.auto_cleanup_enabled:
 			return []
 
-		current_time_us = int(time.time() * 1_000_000)
+		current_time_us = self._now_us()
 		expire_time_us = int(self.config.auto_cleanup_expire_time.value * 1_000_000)
 
 		return self._find_expired_backups(current_time_us, expire_time_us)
\ No newline at end of file
@@ -93,6 +93,9 @@ class OnlinePlayerCounter:
 		self.data_is_correct = False
 		self.player_records: Final[PlayerRecords] = PlayerRecords(self.__is_valid_player)
 
+		# volatile data of the crontab jobs, inherited across plugin reloads
+		self.job_data_store: Final[Dict[str, Any]] = {}
+
 	def __is_valid_player(self, player_name: str) -> bool:
 		blacklist = self.config.scheduled_backup.require_online_players_blacklist
 		return all(
@@ -143,6 +146,10 @@ class OnlinePlayerCounter:
 		thread.start()
 
 	def on_load(self, prev: Any):
+		# inherit it right now, before the crontab jobs start
+		if isinstance(prev_job_data_store := getattr(prev, 'job_data_store', None), dict):
+			self.job_data_store.update(prev_job_data_store)
+
 		should_update_from_api = self.server.is_server_startup()
 
 		# delay this for a little bit, in case minecraft_data_api is loading too
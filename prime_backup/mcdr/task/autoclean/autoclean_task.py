@@ -94,14 +94,20 @@ class AutoCleanListTask(LightTask[List[int]]):
 		backup_ids = status['backup_ids']
 		self.reply(self.tr('list_header', len(backup_ids)))
 		
-		from prime_backup.action.get_backup_action import GetBackupAction
-		for backup_id in backup_ids:
-			try:
-				get_action = GetBackupAction(backup_id)
-				backup_info = get_action.run()
-				self.reply(TextComponents.backup_brief(backup_info))
-			except Exception as e:
-				self.reply(self.tr('get_backup_failed', backup_id, str(e)).set_color(RColor.red))
+		from prime_backup.action.get_backup_action import GetBackupsAction
+		from prime_backup.exceptions import BackupNotFound
+		try:
+			backups = GetBackupsAction(backup_ids).run()
+		except Exception as e:
+			self.reply_lines([self.tr('get_backup_failed', backup_id, str(e)).set_color(RColor.red) for backup_id in backup_ids])
+		else:
+			lines = []
+			for backup_id in backup_ids:
+				if (backup_info := backups.get(backup_id)) is not None:
+					lines.append(TextComponents.backup_brief(backup_info))
+				else:
+					lines.append(self.tr('get_backup_failed', backup_id, str(BackupNotFound(backup_id))).set_color(RColor.red))
+			self.reply_lines(lines)
 		
 		return backup_ids
 
@@ -133,7 +139,6 @@ class AutoCleanCheckTask(LightTask[List[int]]):
 		self.reply(self.tr('found_expired_backups', len(expired_backups)))
 		
 		from prime_backup.mcdr.text_components import TextComponents
-		for backup in expired_backups:
-			self.reply(TextComponents.backup_brief(backup))
+		self.reply_lines([TextComponents.backup_brief(backup) for backup in expired_backups])
 		
 		return [backup.id for backup in expired_backups]
\ No newline at end of file
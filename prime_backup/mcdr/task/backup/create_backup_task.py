@@ -14,12 +14,14 @@ from prime_backup.utils.timer import Timer
 
 
 class CreateBackupTask(HeavyTask[Optional[int]]):
-	def __init__(self, source: CommandSource, comment: str, operator: Optional[Operator] = None):
+	def __init__(self, source: CommandSource, comment: str, operator: Optional[Operator] = None, *, skip_if_unchanged: bool = False):
 		super().__init__(source)
 		self.comment = comment
 		if operator is None:
 			operator = Operator.of(source)
 		self.operator = operator
+		self.skip_if_unchanged = skip_if_unchanged
+		self.skipped_as_unchanged = False
 		self.world_saved_done = threading.Event()
 		self.__waiting_world_save = False
 
@@ -74,8 +76,12 @@ class CreateBackupTask(HeavyTask[Optional[int]]):
 				self.broadcast(self.tr('abort.unloaded').set_color(RColor.red))
 				return None
 
-			action = CreateBackupAction(self.operator, self.comment)
+			action = CreateBackupAction(self.operator, self.comment, skip_if_unchanged=self.skip_if_unchanged)
 			backup = action.run()
+			if action.is_skipped_as_unchanged():
+				self.skipped_as_unchanged = True
+				self.broadcast(self.tr('unchanged', TextComponents.backup_id(backup.id)))
+				return backup.id
 			bls = action.get_new_blobs_summary()
 			cost_create = timer.get_elapsed()
 			cost_total = cost_save_wait + cost_create
@@ -19,9 +19,16 @@ from prime_backup.utils.timer import Timer
 
 
 class RestoreBackupTask(HeavyTask[None]):
-	def __init__(self, source: CommandSource, backup_id: Optional[int] = None, needs_confirm: bool = True, fail_soft: bool = False, verify_blob: bool = True):
+	def __init__(
+			self, source: CommandSource, backup_id: Optional[int] = None, needs_confirm: bool = True, fail_soft: bool = False, verify_blob: bool = True,
+			*, backup: Optional[BackupInfo] = None,
+	):
+		"""
+		:param backup: the already-queried backup to restore. If provided, backup_id is ignored
+		"""
 		super().__init__(source)
-		self.backup_id = backup_id
+		self.backup_id = backup.id if backup is not None else backup_id
+		self.backup = backup
 		self.needs_confirm = needs_confirm
 		self.fail_soft = fail_soft
 		self.verify_blob = verify_blob
@@ -59,7 +66,9 @@ class RestoreBackupTask(HeavyTask[None]):
 
 	@override
 	def run(self):
-		if self.backup_id is None:
+		if self.backup is not None:
+			backup = self.backup
+		elif self.backup_id is None:
 			backup_filter = BackupFilter()
 			backup_filter.requires_non_temporary_backup()
 			candidates = ListBackupAction(backup_filter=backup_filter, limit=1).run()
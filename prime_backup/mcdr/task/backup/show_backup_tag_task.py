@@ -1,4 +1,5 @@
-from typing import Any
+import functools
+from typing import Any, Optional, Dict
 
 from mcdreforged.api.all import CommandSource, RTextBase, RText, RTextList, RColor, RAction
 from typing_extensions import override
@@ -24,9 +25,9 @@ class ShowBackupSingleTagTask(LightTask[None]):
 
 	@override
 	def run(self) -> None:
-		backup = GetBackupAction(self.backup_id).run()
+		backup = GetBackupAction(self.backup_id, cached=True).run()
 		value = backup.tags.get(self.tag_name)
-		if value != BackupTags.NONE:
+		if value is not BackupTags.NONE:
 			self.reply_tr(
 				'value',
 				TextComponents.backup_id(backup.id, backup_data=backup),
@@ -45,50 +46,59 @@ class ShowBackupTagTask(LightTask[None]):
 	def __init__(self, source: CommandSource, backup_id: int):
 		super().__init__(source)
 		self.backup_id = backup_id
+		self.__t_value_types: Dict[type, RTextBase] = {}
 
 	@property
 	@override
 	def id(self) -> str:
 		return 'backup_show_tag'
 
-	def __show_tag(self, backup: BackupInfo, key: str, value: Any):
-		try:
-			tag_name = BackupTagName[key]
-		except KeyError:
-			t_value_type = self.tr('value_type', type(value).__name__)
+	def __get_t_value_type(self, value_type: type) -> RTextBase:
+		# there are only a few value types, and the texts are not modified after creation, so they can be shared
+		if (t_value_type := self.__t_value_types.get(value_type)) is None:
+			t_value_type = self.__t_value_types[value_type] = self.tr('value_type', value_type.__name__)
+		return t_value_type
+
+	@functools.cached_property
+	def __t_not_exists(self) -> RTextBase:
+		return self.tr('not_exists').set_color(RColor.gray)
+
+	def __show_tag(self, backup: BackupInfo, key: str, value: Any, tag_name: Optional[BackupTagName]):
+		if tag_name is None:
+			t_value_type = self.__get_t_value_type(type(value))
 			t_key = RText(key).h(t_value_type)
 		else:
-			t_value_type = self.tr('value_type', tag_name.value.type.__name__)
+			t_value_type = self.__get_t_value_type(tag_name.value.type)
 			t_key = TextComponents.tag_name(tag_name).h(RTextList(tag_name.value.text.copy().set_color(TextColors.backup_tag), '\n', t_value_type))
 
-		if value is not BackupTags.NONE:
-			t_value = TextComponents.auto(value)
+		exists = value is not BackupTags.NONE
+		t_value = TextComponents.auto(value) if exists else self.__t_not_exists
+
+		if self.source.is_console:
+			# no buttons for the console, don't bother creating them
+			self.reply(RTextBase.format('{}: {}', t_key, t_value))
+			return
+
+		if exists:
 			buttons = [
 				RText('[_]', RColor.yellow).h(self.tr('edit', t_key)).c(RAction.suggest_command, mkcmd(f'tag {backup.id} {key} set ')),
 				RText('[x]', RColor.red).h(self.tr('clear', t_key)).c(RAction.suggest_command, mkcmd(f'tag {backup.id} {key} clear')),
 			]
 		else:
-			t_value = self.tr('not_exists').set_color(RColor.gray)
 			buttons = [
 				RText('[+]', RColor.dark_green).h(self.tr('create', t_key)).c(RAction.suggest_command, mkcmd(f'tag {backup.id} {key} set ')),
 			]
-
-		if self.source.is_console:
-			self.reply(RTextBase.format('{}: {}', t_key, t_value))
-		else:
-			self.reply(RTextBase.format('{} {}: {}', RTextBase.join(' ', buttons), t_key, t_value))
+		self.reply(RTextBase.format('{} {}: {}', RTextBase.join(' ', buttons), t_key, t_value))
 
 	@override
 	def run(self) -> None:
-		backup = GetBackupAction(self.backup_id).run()
+		backup = GetBackupAction(self.backup_id, cached=True).run()
 		self.reply(TextComponents.title(self.tr('title', TextComponents.backup_id(backup.id, backup_data=backup))))
 		self.reply_tr('amount', TextComponents.number(len(backup.tags)))
 
-		recognized_names = set()
+		# recognized tags are popped out, so what's left are the unknown ones
+		tags = backup.tags.to_dict()
 		for tag_name in BackupTagName:
-			recognized_names.add(tag_name.name)
-			self.__show_tag(backup, tag_name.name, backup.tags.get(tag_name))
-
-		for key, value in backup.tags.items():
-			if key not in recognized_names:
-				self.__show_tag(backup, key, value)
+			self.__show_tag(backup, tag_name.name, tags.pop(tag_name.name, BackupTags.NONE), tag_name)
+		for key, value in tags.items():
+			self.__show_tag(backup, key, value, None)
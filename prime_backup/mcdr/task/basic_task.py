@@ -1,7 +1,7 @@
 import logging
 import threading
 from abc import ABC
-from typing import Union, Optional, TypeVar
+from typing import Union, Optional, TypeVar, Iterable
 
 from mcdreforged.api.all import CommandSource, RTextBase, PermissionLevel
 from typing_extensions import final, override
@@ -111,6 +111,11 @@ class _BasicTask(Task[_T], ABC):
 			return
 		mcdr_utils.reply_message(self.source, msg, with_prefix=with_prefix)
 
+	def reply_lines(self, msgs: Iterable[Union[str, RTextBase]], *, with_prefix: bool = True):
+		if self._quiet:
+			return
+		mcdr_utils.reply_message_lines(self.source, msgs, with_prefix=with_prefix)
+
 	def reply_tr(self, key: str, *args, **kwargs):
 		with_prefix = kwargs.pop('with_prefix', True)
 		self.reply(self.tr(key, *args, **kwargs), with_prefix=with_prefix)
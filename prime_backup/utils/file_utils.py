@@ -7,9 +7,10 @@ from typing import Optional, Literal, BinaryIO, Callable
 
 import psutil
 
-from prime_backup.utils import path_utils
+from prime_backup.utils import path_utils, hash_utils
 
 HAS_COPY_FILE_RANGE = callable(getattr(os, 'copy_file_range', None))
+_COPY_AND_HASH_BUF_SIZE = 1024 * 1024
 
 
 def __is_cow_not_supported_error(e: int) -> bool:
@@ -46,6 +47,47 @@ def copy_file_fast(
 	shutil.copyfile(src_path, dst_path, follow_symlinks=False)
 
 
+def copy_file_and_hash(
+		src_path: Path, dst_path: Path, *,
+		open_r_func: Callable[[Path, "Literal['rb']"], BinaryIO] = open,
+		open_w_func: Callable[[Path, "Literal['wb']"], BinaryIO] = open,
+) -> hash_utils.SizeAndHash:
+	"""
+	Copy the file, and calculate the size and hash of the copied content in the same pass,
+	so the content only needs to be read once
+	"""
+	hasher = hash_utils.create_hasher()
+	buf = bytearray(_COPY_AND_HASH_BUF_SIZE)
+	view = memoryview(buf)
+	size = 0
+	with open_r_func(src_path, 'rb') as f_src, open_w_func(dst_path, 'wb') as f_dst:
+		while n := f_src.readinto(buf):
+			chunk = view[:n]
+			hasher.update(chunk)
+			f_dst.write(chunk)
+			size += n
+	return hash_utils.SizeAndHash(size, hasher.hexdigest())
+
+
+def drop_file_cache(path: Path):
+	"""
+	Hint the kernel that the cached pages of the file are no longer needed, so they don't evict other useful caches
+	It's just a hint, so all errors are ignored
+	"""
+	if not hasattr(os, 'posix_fadvise'):  # posix only
+		return
+	try:
+		fd = os.open(path, os.O_RDONLY)
+	except OSError:
+		return
+	try:
+		os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+	except OSError:
+		pass
+	finally:
+		os.close(fd)
+
+
 def rm_rf(path: Path, *, missing_ok: bool = False):
 	"""
 	Does not follow symlink
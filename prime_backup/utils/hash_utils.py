@@ -1,4 +1,5 @@
 import dataclasses
+import os
 from pathlib import Path
 from typing import IO, Optional, TYPE_CHECKING
 
@@ -8,14 +9,20 @@ if TYPE_CHECKING:
 	from prime_backup.types.hash_method import Hasher, HashMethod
 
 
-def create_hasher(*, hash_method: Optional['HashMethod'] = None) -> 'Hasher':
+def __get_hash_method(hash_method: Optional['HashMethod']) -> 'HashMethod':
 	if hash_method is None:
 		from prime_backup.db.access import DbAccess
 		hash_method = DbAccess.get_hash_method()
-	return hash_method.value.create_hasher()
+	return hash_method
+
+
+def create_hasher(*, hash_method: Optional['HashMethod'] = None) -> 'Hasher':
+	return __get_hash_method(hash_method).value.create_hasher()
 
 
 _READ_BUF_SIZE = 128 * 1024
+_LARGE_FILE_READ_BUF_SIZE = 1024 * 1024
+_LARGE_FILE_SIZE_THRESHOLD = 1024 * 1024  # 1MiB
 
 
 @dataclasses.dataclass(frozen=True)
@@ -35,17 +42,48 @@ def calc_reader_size_and_hash(
 	return SizeAndHash(reader.get_read_len(), reader.get_hash())
 
 
-def calc_file_size_and_hash(path: Path, **kwargs) -> SizeAndHash:
-	with open(path, 'rb') as f:
-		return calc_reader_size_and_hash(f, **kwargs)
+def __calc_raw_file_size_and_hash(file_obj: IO[bytes], hash_method: Optional['HashMethod'], buf_size: int) -> SizeAndHash:
+	"""
+	Read directly into a reused buffer, so there's no per-chunk bytes allocation and copying,
+	and the hasher can release the GIL on the large chunk
+
+	mmap is not used here, since the source file might get truncated during the hashing, which results in a SIGBUS
+	"""
+	hasher = create_hasher(hash_method=hash_method)
+	buf = bytearray(buf_size)
+	view = memoryview(buf)
+	size = 0
+	while n := file_obj.readinto(buf):
+		hasher.update(view[:n])
+		size += n
+	return SizeAndHash(size, hasher.hexdigest())
+
+
+def __advise_sequential_read(fd: int):
+	if hasattr(os, 'posix_fadvise'):  # posix only
+		try:
+			os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+		except OSError:
+			pass  # it's just a hint
+
+
+def calc_file_size_and_hash(path: Path, *, hash_method: Optional['HashMethod'] = None) -> SizeAndHash:
+	# hashers like blake3 hash large chunks with SIMD and release the GIL, so feed the whole file with as few chunks as possible.
+	# The buffer size has a floor, in case the file grows after the fstat
+	with open(path, 'rb', buffering=0) as f:
+		size = os.fstat(f.fileno()).st_size
+		if size >= _LARGE_FILE_SIZE_THRESHOLD:
+			__advise_sequential_read(f.fileno())
+		buf_size = max(_READ_BUF_SIZE, min(size, _LARGE_FILE_READ_BUF_SIZE))
+		return __calc_raw_file_size_and_hash(f, hash_method, buf_size)
 
 
 def calc_reader_hash(file_obj: IO[bytes], **kwargs) -> str:
 	return calc_reader_size_and_hash(file_obj, **kwargs).hash
 
 
-def calc_file_hash(path: Path, **kwargs) -> str:
-	return calc_file_size_and_hash(path, **kwargs).hash
+def calc_file_hash(path: Path, *, hash_method: Optional['HashMethod'] = None) -> str:
+	return calc_file_size_and_hash(path, hash_method=hash_method).hash
 
 
 def calc_bytes_hash(buf: bytes) -> str:
@@ -1,5 +1,5 @@
 from abc import ABC
-from typing import Union, Any
+from typing import Union, Any, Iterable
 
 from mcdreforged.api.all import ServerInterface, CommandSource, PlayerCommandSource, ConsoleCommandSource, RTextBase, \
 	RText, RTextList, RColor, RAction
@@ -39,6 +39,19 @@ def reply_message(source: CommandSource, msg: Union[str, RTextBase], *, with_pre
 	source.reply(msg)
 
 
+def reply_message_lines(source: CommandSource, msgs: Iterable[Union[str, RTextBase]], *, with_prefix: bool = True):
+	"""
+	Reply multiple lines in a single message. Each line still gets its own prefix
+	"""
+	if with_prefix:
+		prefix = __make_message_prefix()
+		msgs = [RTextList(prefix, msg) for msg in msgs]
+	else:
+		msgs = list(msgs)
+	if len(msgs) > 0:
+		source.reply(RTextBase.join('\n', msgs))
+
+
 def broadcast_message(msg: Union[str, RTextBase], *, with_prefix: bool = True):
 	if with_prefix:
 		msg = RTextList(__make_message_prefix(), msg)
@@ -2,17 +2,33 @@ import collections
 import contextlib
 import operator
 import time
-from typing import Dict, TypeVar, Generic, Optional, Callable, Any, Generator
+from typing import Dict, TypeVar, Generic, Optional, Callable, Any, Generator, Iterable, Tuple, ContextManager
 
 _K = TypeVar('_K')
+_NULL_CONTEXT: ContextManager[None] = contextlib.nullcontext()  # stateless, so it can be shared and reused
 
 
 class TimeCostStats(Generic[_K]):
-	def __init__(self):
+	def __init__(self, keys: Iterable[_K] = (), *, enabled: bool = True):
+		"""
+		:param keys: keys to be registered in advance, so they are always included in the costs, in the given order
+		:param enabled: if not enabled, nothing will be measured, and all costs stay 0
+		"""
+		self.__keys: Tuple[_K, ...] = tuple(keys)
+		self.__enabled = enabled
 		self.__costs: Dict[_K, float] = collections.defaultdict(float)
+		self.reset()
+
+	def measure_time_cost(self, *keys: _K) -> ContextManager[Optional[Callable[[], float]]]:
+		"""
+		:return: a context manager, which provides a cost getter, or None if this stats is not enabled
+		"""
+		if not self.__enabled:
+			return _NULL_CONTEXT
+		return self.__measure_time_cost(keys)
 
 	@contextlib.contextmanager
-	def measure_time_cost(self, *keys: _K) -> Generator[Callable[[], float], Any, None]:
+	def __measure_time_cost(self, keys: Tuple[_K, ...]) -> Generator[Callable[[], float], Any, None]:
 		def get_cost() -> float:
 			if cost is None:
 				raise RuntimeError('not done yet')
@@ -41,3 +57,5 @@ class TimeCostStats(Generic[_K]):
 
 	def reset(self):
 		self.__costs.clear()
+		for key in self.__keys:
+			self.__costs[key] = 0.0
@@ -0,0 +1,144 @@
+import contextlib
+import time
+import unittest
+from typing import Optional
+from unittest import mock
+
+from mcdreforged.api.all import ServerInterface, RText
+
+from prime_backup.action.create_backup_action import CreateBackupAction
+from prime_backup.config.config import Config
+from prime_backup.mcdr import mcdr_globals
+from prime_backup.mcdr.crontab_job.auto_cleanup_job import AutoCleanupJob
+from prime_backup.mcdr.online_player_counter import OnlinePlayerCounter
+from prime_backup.mcdr.task.backup.delete_backup_task import DeleteBackupTask
+from prime_backup.types.operator import Operator, PrimeBackupOperatorNames
+from prime_backup.types.units import Duration
+from tests.utils import temp_db_env
+
+_HOUR_US = 3600 * 1_000_000
+_DAY_US = 24 * _HOUR_US
+
+
+class _TestAutoCleanupJob(AutoCleanupJob):
+	now_us: int = 0
+
+	def _now_us(self) -> int:
+		return self.now_us
+
+
+class AutoCleanupJobTestCase(unittest.TestCase):
+	def setUp(self):
+		with contextlib.ExitStack() as es:
+			world_dir = es.enter_context(temp_db_env())
+			(world_dir / 'level.dat').write_bytes(b'foo')
+
+			config = Config.get()
+			es.callback(setattr, config, 'scheduled_backup', config.scheduled_backup)
+			config.scheduled_backup = config.scheduled_backup.copy()
+			config.scheduled_backup.auto_cleanup_enabled = True
+			config.scheduled_backup.auto_cleanup_expire_time = Duration('1d')
+			config.scheduled_backup.auto_cleanup_warning_time = Duration('1h')
+
+			self.server = mock.Mock()
+			self.server.is_server_running.return_value = True
+			self.server.rtr.side_effect = lambda key, *args, **kwargs: RText(key)
+			es.enter_context(mock.patch.object(ServerInterface, 'si', return_value=self.server))
+			es.enter_context(mock.patch.object(mcdr_globals, 'server', self.server, create=True))
+
+			es.callback(setattr, OnlinePlayerCounter, '_OnlinePlayerCounter__inst', None)
+			self.counter = OnlinePlayerCounter(self.server)
+			self.counter.data_is_correct = True
+
+			self.task_manager = mock.Mock()
+			self.addCleanup(es.pop_all().close)
+
+	def create_job(self, now_us: int) -> _TestAutoCleanupJob:
+		job = _TestAutoCleanupJob(mock.Mock(), self.task_manager)
+		job.now_us = now_us
+		return job
+
+	@staticmethod
+	def create_backup(operator: Optional[Operator] = None) -> int:
+		if operator is None:
+			operator = Operator.pb(PrimeBackupOperatorNames.scheduled_backup)
+		return CreateBackupAction(operator, '').run().id
+
+	@staticmethod
+	def expired_now_us() -> int:
+		return time.time_ns() // 1000 + _DAY_US + 1_000_000
+
+	def test_0_schedule_and_cancel(self):
+		bid1, bid2 = self.create_backup(), self.create_backup()
+		self.create_backup(Operator.literal('test'))
+		self.counter.on_player_joined('Steve')
+
+		job = self.create_job(now := self.expired_now_us())
+		job.run()
+		status = job.get_cleanup_status()
+		self.assertIsNotNone(status)
+		self.assertEqual([bid2, bid1], status['backup_ids'])
+		self.assertEqual(now + _HOUR_US, status['scheduled_time_us'])
+		self.assertEqual(status, self.create_job(now).get_cleanup_status())  # stored in the job data store
+		self.server.broadcast.assert_called_once()
+
+		self.assertTrue(job.cancel_scheduled_cleanup())
+		self.assertIsNone(job.get_cleanup_status())
+		self.assertEqual({}, self.counter.job_data_store)
+		self.assertFalse(job.cancel_scheduled_cleanup())
+
+	def test_1_execute(self):
+		bid = self.create_backup()
+		self.counter.on_player_joined('Steve')
+
+		job = self.create_job(self.expired_now_us())
+		job.run()
+		job.now_us += _HOUR_US - 1
+		job.run()
+		self.task_manager.add_task.assert_not_called()
+
+		job.now_us += 1
+		job.run()
+		self.task_manager.add_task.assert_called_once()
+		task, callback = self.task_manager.add_task.call_args.args
+		self.assertIsInstance(task, DeleteBackupTask)
+		self.assertEqual([bid], task.backup_ids)
+
+		callback(None, None)
+		self.assertIsNone(job.get_cleanup_status())
+		self.assertEqual({}, self.counter.job_data_store)
+
+	def test_2_no_valid_player_online(self):
+		self.create_backup()
+		job = self.create_job(self.expired_now_us())
+		job.run()
+		self.assertIsNone(job.get_cleanup_status())
+
+	def test_3_scan_throttled(self):
+		self.create_backup()
+		job = self.create_job(self.expired_now_us())
+		job.run()  # no valid player online, the scan is done but nothing is scheduled
+
+		self.counter.on_player_joined('Steve')
+		job.now_us += 30 * 1_000_000
+		job.run()
+		self.assertIsNone(job.get_cleanup_status())
+
+		job.now_us += 30 * 1_000_000
+		job.run()
+		self.assertIsNotNone(job.get_cleanup_status())
+
+	def test_4_job_data_store_inherited(self):
+		self.create_backup()
+		self.counter.on_player_joined('Steve')
+		self.create_job(self.expired_now_us()).run()
+
+		OnlinePlayerCounter._OnlinePlayerCounter__inst = None
+		new_counter = OnlinePlayerCounter(self.server)
+		new_counter.on_load(self.counter)
+		self.assertEqual(self.counter.job_data_store, new_counter.job_data_store)
+		self.assertIsNotNone(self.create_job(self.expired_now_us()).get_cleanup_status())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,75 @@
+import contextlib
+import os
+import unittest
+
+from prime_backup.action.create_backup_action import CreateBackupAction
+from prime_backup.action.list_backup_action import ListBackupIdAction
+from prime_backup.config.config import Config
+from prime_backup.types.backup_tags import BackupTags, BackupTagName
+from prime_backup.types.operator import Operator
+from tests.utils import temp_db_env
+
+
+class CreateBackupActionSkipIfUnchangedTestCase(unittest.TestCase):
+	def setUp(self):
+		with contextlib.ExitStack() as es:
+			self.world_dir = es.enter_context(temp_db_env())
+			(self.world_dir / 'region').mkdir()
+			(self.world_dir / 'level.dat').write_bytes(b'level')
+			(self.world_dir / 'region' / 'r.0.0.mca').write_bytes(b'region' * 1000)
+			os.symlink('level.dat', self.world_dir / 'link')
+
+			config = Config.get()
+			reuse_stat_unchanged_file = config.backup.reuse_stat_unchanged_file
+			es.callback(setattr, config.backup, 'reuse_stat_unchanged_file', reuse_stat_unchanged_file)
+			config.backup.reuse_stat_unchanged_file = True
+			self.addCleanup(es.pop_all().close)
+
+	def test_0_unchanged(self):
+		backup_id = CreateBackupAction(Operator.literal('test'), '').run().id
+
+		action = CreateBackupAction(Operator.literal('test'), '', skip_if_unchanged=True)
+		self.assertEqual(backup_id, action.run().id)
+		self.assertTrue(action.is_skipped_as_unchanged())
+		self.assertEqual([backup_id], ListBackupIdAction().run())
+
+	def test_1_changed(self):
+		backup_id = CreateBackupAction(Operator.literal('test'), '').run().id
+
+		file_path = self.world_dir / 'level.dat'
+		file_path.write_bytes(b'level2')
+		os.utime(file_path, ns=(0, file_path.stat().st_mtime_ns + 1000))
+		action = CreateBackupAction(Operator.literal('test'), '', skip_if_unchanged=True)
+		self.assertNotEqual(backup_id, action.run().id)
+		self.assertFalse(action.is_skipped_as_unchanged())
+
+	def test_2_file_removed(self):
+		CreateBackupAction(Operator.literal('test'), '').run()
+
+		(self.world_dir / 'region' / 'r.0.0.mca').unlink()
+		action = CreateBackupAction(Operator.literal('test'), '', skip_if_unchanged=True)
+		action.run()
+		self.assertFalse(action.is_skipped_as_unchanged())
+
+	def test_3_last_backup_not_regular(self):
+		for tag_name in [BackupTagName.temporary, BackupTagName.hidden]:
+			with self.subTest(tag_name=tag_name):
+				tags = BackupTags()
+				tags.set(tag_name, True)
+				CreateBackupAction(Operator.literal('test'), '', tags=tags).run()
+
+				action = CreateBackupAction(Operator.literal('test'), '', skip_if_unchanged=True)
+				action.run()
+				self.assertFalse(action.is_skipped_as_unchanged())
+
+	def test_4_reuse_stat_unchanged_file_disabled(self):
+		Config.get().backup.reuse_stat_unchanged_file = False
+		CreateBackupAction(Operator.literal('test'), '').run()
+
+		action = CreateBackupAction(Operator.literal('test'), '', skip_if_unchanged=True)
+		action.run()
+		self.assertFalse(action.is_skipped_as_unchanged())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -3,6 +3,7 @@ import contextlib
 import dataclasses
 import functools
 import hashlib
+import importlib.util
 import os
 import random
 import shutil
@@ -417,7 +418,7 @@ class FuzzyRunTestCase(unittest.TestCase):
 		FilesetAllocateArgsDefaults.candidate_max_changes_ratio = 0.4  # increase this for easier fileset reuse
 
 	@contextlib.contextmanager
-	def create_env(self, rnd: random.Random) -> Generator[Tuple[BackupFuzzyEnvironment, Path, Path], None, None]:
+	def create_env(self, rnd: random.Random, *, hash_method: HashMethod, concurrency: int, reuse_stat_unchanged_file: bool) -> Generator[Tuple[BackupFuzzyEnvironment, Path, Path], None, None]:
 		test_root = Path(os.environ.get('PRIME_BACKUP_FUZZY_TEST_ROOT', 'run/unittest'))
 		pb_dir = test_root / 'pb_files'
 		fake_server_dir = test_root / 'server'
@@ -434,14 +435,20 @@ class FuzzyRunTestCase(unittest.TestCase):
 		test_root.mkdir(parents=True, exist_ok=True)
 		gitignore_file.write_text('**\n', encoding='utf8')
 
-		Config.get().storage_root = str(pb_dir)
-		Config.get().backup.source_root = str(fake_server_dir)
-		Config.get().backup.targets = [env_dir.name]
-		Config.get().backup.hash_method = HashMethod.xxh128
-		Config.get().backup.compress_method = CompressMethod.plain
+		config = Config.get()
+		prev_concurrency, prev_reuse_stat_unchanged_file = config.concurrency, config.backup.reuse_stat_unchanged_file
+		config.storage_root = str(pb_dir)
+		config.backup.source_root = str(fake_server_dir)
+		config.backup.targets = [env_dir.name]
+		config.backup.hash_method = hash_method
+		config.backup.compress_method = CompressMethod.plain
+		config.backup.reuse_stat_unchanged_file = reuse_stat_unchanged_file
+		config.concurrency = concurrency
 		DbAccess.init(create=True, migrate=False)
 
 		with contextlib.ExitStack() as es:
+			es.callback(setattr, config, 'concurrency', prev_concurrency)
+			es.callback(setattr, config.backup, 'reuse_stat_unchanged_file', prev_reuse_stat_unchanged_file)
 			if os.environ.get('PRIME_BACKUP_FUZZY_TEST_KEEP', '').lower() not in ('true', '1'):
 				es.callback(rm_test_files_dirs)
 			es.callback(DbAccess.shutdown)
@@ -449,6 +456,15 @@ class FuzzyRunTestCase(unittest.TestCase):
 			yield env, fake_server_dir, temp_dir
 
 	def test_fuzzy_run(self):
+		self.run_fuzzy_test(hash_method=HashMethod.xxh128, concurrency=1, reuse_stat_unchanged_file=False)
+
+	def test_fuzzy_run_concurrent_reuse_unchanged(self):
+		# covers the hash pre-calculation, the stat unchanged file reusing, and the blake3 file hashing
+		# blake3 is an optional dependency, fallback to another hash method if it's not installed
+		hash_method = HashMethod.blake3 if importlib.util.find_spec('blake3') is not None else HashMethod.sha256
+		self.run_fuzzy_test(hash_method=hash_method, concurrency=4, reuse_stat_unchanged_file=True)
+
+	def run_fuzzy_test(self, *, hash_method: HashMethod, concurrency: int, reuse_stat_unchanged_file: bool):
 		env: BackupFuzzyEnvironment
 		svr_dir: Path
 		temp_dir: Path
@@ -457,8 +473,9 @@ class FuzzyRunTestCase(unittest.TestCase):
 		iterations = int(os.environ.get('PRIME_BACKUP_FUZZY_TEST_ITERATION', '200'))
 		self.logger.info(f'Random seed: {seed}')
 		self.logger.info(f'Iterations: {iterations}')
+		self.logger.info(f'Hash method: {hash_method.name}, concurrency: {concurrency}, reuse stat unchanged file: {reuse_stat_unchanged_file}')
 		rnd = random.Random(seed)
-		with self.create_env(rnd) as (env, svr_dir, temp_dir):
+		with self.create_env(rnd, hash_method=hash_method, concurrency=concurrency, reuse_stat_unchanged_file=reuse_stat_unchanged_file) as (env, svr_dir, temp_dir):
 			def create_backup() -> int:
 				_TestStats.get().backup_create += 1
 				return CreateBackupAction(Operator.literal('test'), '').run().id
@@ -0,0 +1,60 @@
+import contextlib
+import unittest
+
+from sqlalchemy.orm import Session
+
+from prime_backup.action.create_backup_action import CreateBackupAction
+from prime_backup.action.delete_backup_action import DeleteBackupAction
+from prime_backup.action.get_backup_action import GetBackupAction
+from prime_backup.action.operate_backup_tag_action import SetBackupTagAction
+from prime_backup.exceptions import BackupNotFound
+from prime_backup.types.backup_tags import BackupTagName
+from prime_backup.types.operator import Operator
+from tests.utils import temp_db_env
+
+
+class GetBackupActionTestCase(unittest.TestCase):
+	def setUp(self):
+		with contextlib.ExitStack() as es:
+			world_dir = es.enter_context(temp_db_env())
+			(world_dir / 'level.dat').write_bytes(b'foo')
+			self.addCleanup(es.pop_all().close)
+
+	def test_0_cached(self):
+		backup_id = CreateBackupAction(Operator.literal('test'), '').run().id
+		backup = GetBackupAction(backup_id, cached=True).run()
+		self.assertIs(backup, GetBackupAction(backup_id, cached=True).run())
+
+	def test_1_not_cached_by_default(self):
+		backup_id = CreateBackupAction(Operator.literal('test'), '').run().id
+		backup = GetBackupAction(backup_id, cached=True).run()
+		self.assertIsNot(backup, GetBackupAction(backup_id).run())
+		self.assertIs(backup, GetBackupAction(backup_id, cached=True).run())
+
+	def test_2_invalidated_by_set_tag(self):
+		backup_id = CreateBackupAction(Operator.literal('test'), '').run().id
+		self.assertFalse(GetBackupAction(backup_id, cached=True).run().tags.is_hidden())
+
+		SetBackupTagAction(backup_id, BackupTagName.hidden, True).run()
+		self.assertTrue(GetBackupAction(backup_id, cached=True).run().tags.is_hidden())
+
+	def test_3_invalidated_by_delete(self):
+		backup_id = CreateBackupAction(Operator.literal('test'), '').run().id
+		GetBackupAction(backup_id, cached=True).run()
+
+		DeleteBackupAction(backup_id).run()
+		with self.assertRaises(BackupNotFound):
+			GetBackupAction(backup_id, cached=True).run()
+
+	def test_4_no_global_session_listener(self):
+		backup_id = CreateBackupAction(Operator.literal('test'), '').run().id
+		GetBackupAction(backup_id, cached=True).run()
+
+		# the write tracking listeners are registered on the prime backup sessions only
+		with Session() as session:
+			self.assertEqual(0, len(session.dispatch.after_flush))
+			self.assertEqual(0, len(session.dispatch.do_orm_execute))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,33 @@
+import contextlib
+import tempfile
+from pathlib import Path
+from typing import Generator
+
+from prime_backup.config.config import Config
+from prime_backup.db.access import DbAccess
+
+
+@contextlib.contextmanager
+def temp_db_env() -> Generator[Path, None, None]:
+	"""
+	Set up a temporary storage root, and a source root with an empty "world" backup target, then init the db.
+	The overridden config values are restored on exit
+
+	:return: the path to the world directory
+	"""
+	with contextlib.ExitStack() as es:
+		temp_dir = Path(es.enter_context(tempfile.TemporaryDirectory()))
+		world_dir = temp_dir / 'server' / 'world'
+		world_dir.mkdir(parents=True)
+
+		config = Config.get()
+		es.callback(setattr, config, 'storage_root', config.storage_root)
+		es.callback(setattr, config.backup, 'source_root', config.backup.source_root)
+		es.callback(setattr, config.backup, 'targets', config.backup.targets)
+		config.storage_root = str(temp_dir / 'pb_files')
+		config.backup.source_root = str(temp_dir / 'server')
+		config.backup.targets = [world_dir.name]
+
+		DbAccess.init(create=True, migrate=False)
+		es.callback(DbAccess.shutdown)
+		yield world_dir